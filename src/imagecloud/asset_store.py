@@ -0,0 +1,79 @@
+import os
+import io
+import shutil
+import hashlib
+import threading
+from PIL import Image
+from imagecloud.image_wrappers import ImageSource
+
+ASSET_DIRECTORY_NAME = 'layout_assets'
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+class AssetStore:
+    """
+    content-addressed directory of layout images, each stored once as <sha1-of-content>.<suffix>
+    source files are hard-linked (or copied across filesystems), in-memory images are encoded once as png
+    to_asset names an image the same way for other containers (layout bundles)
+    """
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._digests: dict[tuple[str, int, int], str] = dict()
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def to_asset(self, image: ImageSource | Image.Image) -> tuple[str, str | bytes]:
+        """
+        content-addressed asset name of image, with the filepath to link or copy it from, or its encoded bytes
+        """
+        if isinstance(image, ImageSource) and image.member is None:
+            suffix = os.path.splitext(image.filepath)[1].lower()
+            return ('{0}{1}'.format(self._to_file_digest(image.filepath), suffix), image.filepath)
+        if isinstance(image, ImageSource):
+            with image.open_file() as file:
+                data = file.read()
+            suffix = os.path.splitext(image.member)[1].lower()
+        else:
+            encoded = io.BytesIO()
+            image.save(encoded, 'png')
+            data = encoded.getvalue()
+            suffix = '.png'
+        return ('{0}{1}'.format(hashlib.sha1(data).hexdigest(), suffix), data)
+
+    def store(self, image: ImageSource | Image.Image) -> str:
+        name, content = self.to_asset(image)
+        asset_filepath = os.path.join(self._directory, name)
+        if os.path.exists(asset_filepath):
+            return asset_filepath
+
+        os.makedirs(self._directory, exist_ok=True)
+        # link, copy or write to a temporary name then rename, so a concurrent writer never sees a partial asset
+        temporary_filepath = '{0}.{1}.{2}.tmp'.format(asset_filepath, os.getpid(), threading.get_ident())
+        if isinstance(content, bytes):
+            with open(temporary_filepath, 'wb') as file:
+                file.write(content)
+        else:
+            try:
+                os.link(content, temporary_filepath)
+            except OSError:
+                shutil.copyfile(content, temporary_filepath)
+        os.replace(temporary_filepath, asset_filepath)
+        return asset_filepath
+
+    def _to_file_digest(self, filepath: str) -> str:
+        stat = os.stat(filepath)
+        identity = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if identity in self._digests:
+                return self._digests[identity]
+        digest = hashlib.sha1()
+        with open(filepath, 'rb') as file:
+            for chunk in iter(lambda: file.read(DIGEST_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        result = digest.hexdigest()
+        with self._lock:
+            self._digests[identity] = result
+        return result
@@ -1,33 +1,70 @@
 import logging
-import datetime
+import time
 from sys import stdout
+from typing import Any
 import traceback
+from typing import TYPE_CHECKING
 from imagecloud.logger_level import LoggerLevel
 from imagecloud.native.base_logger import (
     native_set_base_logger
 )
+if TYPE_CHECKING:
+    from imagecloud.tracer import Tracer
 
 class  BaseLogger:
     def __init__(self, name: str, level: LoggerLevel) -> None:
         self._name = name
         self._level = level
-        self._indent_stack: list[str] = list()
+        # indents are formatted, and joined, only when a message is logged under them
+        self._indent_stack: list[tuple[str, tuple[Any, ...]]] = list()
+        self._indent: str | None = ''
         self._logging_buffer: list[tuple[LoggerLevel,str]] = list()
         self._buffer_logging: bool = False
+        self._prefix_second: int | None = None
+        self._prefix_time: str = ''
+        self._tracer: 'Tracer | None' = None
         self._logger = logging.getLogger(name)
         self._logger.setLevel(level.value)
+        # loggers are process-wide by name, drop handlers from any previous BaseLogger of this name
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+            handler.close()
         native_set_base_logger(level.value, self._native_logger_callback)
         self._logger.addHandler(logging.StreamHandler(stdout))
                                     
     def get_prefix_message(self, level: LoggerLevel) -> str:
-        now = datetime.datetime.now()
-        return '{0}-{1} {2}'.format(
-            now.strftime('%Y-%m-%dT%H:%M:%S'),
-            '%02d' % (now.microsecond / 10000),
+        now = time.time()
+        second = int(now)
+        # the date and time to the second is formatted once per second
+        if second != self._prefix_second:
+            self._prefix_second = second
+            self._prefix_time = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+        return '{0}-{1:02d} {2}'.format(
+            self._prefix_time,
+            int((now - second) * 100),
             level.name
         )
+
+    def is_enabled(self, level: LoggerLevel) -> bool:
+        return self._level != LoggerLevel.NOT_SET and self._level.value <= level.value
+
+    @property
+    def tracer(self) -> 'Tracer | None':
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer: 'Tracer | None') -> None:
+        """
+        trace a span for each indent, from push_indent to pop_indent
+        """
+        self._tracer = tracer
+
     def reset_context(self) -> None:
-        self._indent_stack: list[str] = list()
+        if self._tracer is not None:
+            for _ in self._indent_stack:
+                self._tracer.end()
+        self._indent_stack = list()
+        self._indent = ''
         self._logging_buffer: list[tuple[LoggerLevel,str]] = list()
         self._buffer_logging: bool = False
 
@@ -38,29 +75,46 @@ class  BaseLogger:
         
     @property
     def indent(self) -> str:
-        result = ''.join(self._indent_stack)
-        if 0 < len(self._indent_stack) and 1 < len(self._indent_stack[-1]):
-            result = '{0} '.format(result)
-        return result
+        if self._indent is None:
+            indents = ['\t{0}'.format(v.format(*args) if args else v) for v, args in self._indent_stack]
+            result = ''.join(indents)
+            if 0 < len(indents) and 1 < len(indents[-1]):
+                result = '{0} '.format(result)
+            self._indent = result
+        return self._indent
     
-    def push_indent(self, v: str = '') -> None:
-        self._indent_stack.append('\t{0}'.format(v))
+    def push_indent(self, v: str = '', *args: Any) -> None:
+        """
+        indent following messages by v, formatted with args (as str.format) only when a message is logged
+        """
+        self._indent_stack.append((v, args))
+        self._indent = None
+        if self._tracer is not None:
+            self._tracer.begin(v, *args)
 
     def pop_indent(self) -> None:
         if 0 < len(self._indent_stack):
             self._indent_stack.pop()
+            self._indent = None
+            if self._tracer is not None:
+                self._tracer.end()
     
-    def error(self, msg: str) -> None:
-        self._log(LoggerLevel.ERROR, msg)
+    # messages with args are formatted (as str.format) only when their level is logged
+    def error(self, msg: str, *args: Any) -> None:
+        if self.is_enabled(LoggerLevel.ERROR):
+            self._log(LoggerLevel.ERROR, msg.format(*args) if args else msg)
         
-    def warning(self, msg: str) -> None:
-        self._log(LoggerLevel.WARNING, msg)
+    def warning(self, msg: str, *args: Any) -> None:
+        if self.is_enabled(LoggerLevel.WARNING):
+            self._log(LoggerLevel.WARNING, msg.format(*args) if args else msg)
 
-    def info(self, msg: str) -> None:
-        self._log(LoggerLevel.INFO, msg)
+    def info(self, msg: str, *args: Any) -> None:
+        if self.is_enabled(LoggerLevel.INFO):
+            self._log(LoggerLevel.INFO, msg.format(*args) if args else msg)
 
-    def debug(self, msg: str) -> None:
-        self._log(LoggerLevel.DEBUG, msg)
+    def debug(self, msg: str, *args: Any) -> None:
+        if self.is_enabled(LoggerLevel.DEBUG):
+            self._log(LoggerLevel.DEBUG, msg.format(*args) if args else msg)
 
     def start_buffering(self) -> None:
         self._buffer_logging = True
@@ -73,7 +127,7 @@ class  BaseLogger:
         self._logging_buffer = list()
 
     def _log(self, level: LoggerLevel, msg: str, native: bool = False) -> bool:
-        if self._level != LoggerLevel.NOT_SET and self._level.value <= level.value:
+        if self.is_enabled(level):
             if self.buffering and level in [LoggerLevel.INFO, LoggerLevel.DEBUG]:
                 self._logging_buffer.append((level, msg))
             else:
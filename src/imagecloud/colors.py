@@ -1,11 +1,9 @@
 from PIL import ImagePalette
 from enum import Enum
+from functools import lru_cache
 import colorsys
+import numpy as np
 from random import Random
-from webcolors import (
-    name_to_rgb,
-    names as color_names,
-)
 
 unique_rgb: tuple[int, int, int] = [
     (173, 216, 230),
@@ -83,6 +81,8 @@ class Color:
 
 class NamedColor(Color):
     def __init__(self, name: str):
+        # webcolors is imported at first use, only named colors need it
+        from webcolors import name_to_rgb
         self._name = name
         rgb = name_to_rgb(name)
         super().__init__(rgb.red, rgb.green, rgb.blue)
@@ -109,23 +109,27 @@ class IntColor(Color):
             integer & int(0xFF)
         ) 
 
-WHITE_COLOR = NamedColor('white')
-BLACK_COLOR = NamedColor('black')
+NAMED_COLOR_CONSTANTS = {
+    'WHITE_COLOR': 'white',
+    'BLACK_COLOR': 'black'
+}
 
-def to_ImagePalette(colors: list[Color]) -> ImagePalette.ImagePalette:
-    bytearray_pallete: bytearray = bytearray(3*len(colors))
-    b: int = 0
-    for c in colors:
-        bytearray_pallete[b] = c.red
-        b += 1
-        bytearray_pallete[b] = c.green
-        b += 1
-        bytearray_pallete[b] = c.blue
-        b += 1
+def __getattr__(name: str) -> NamedColor:
+    # WHITE_COLOR and BLACK_COLOR are created on first access, so importing colors does not import webcolors
+    if name in NAMED_COLOR_CONSTANTS:
+        color = NamedColor(NAMED_COLOR_CONSTANTS[name])
+        globals()[name] = color
+        return color
+    raise AttributeError('module {0} has no attribute {1}'.format(__name__, name))
+
+def to_rgb_lut(colors: list[Color]) -> np.ndarray:
+    # (len(colors), 3) uint8 lookup table, indexing it with a label array colors every label at once
+    return np.array([(c.red, c.green, c.blue) for c in colors], dtype=np.uint8).reshape(len(colors), 3)
 
+def to_ImagePalette(colors: list[Color]) -> ImagePalette.ImagePalette:
     return ImagePalette.ImagePalette(
          mode='RGB',
-         palette=bytearray_pallete
+         palette=bytearray(to_rgb_lut(colors).tobytes())
      )       
     
 def generate_picked_colors(count: int) -> list[Color]:
@@ -150,16 +154,16 @@ def generate_distinct_colors(count: int) -> list[DistinctColor]:
     return result
 
 def generate_named_colors(count: int) -> list[NamedColor]:
+    # random names without repeats until all names are used; drawn from a shuffled list instead of removing picks
+    from webcolors import names as color_names
     rand = Random()
-    names = color_names()
+    names: list[str] = list()
     result: list[NamedColor] = list()
     for _ in range(count):
         if 0 == len(names):
-            names = color_names()
-        
-        name = names[rand.randint(0, len(names) - 1)]
-        names.remove(name)
-        result.append(NamedColor(name))
+            names = list(color_names())
+            rand.shuffle(names)
+        result.append(NamedColor(names.pop()))
     return result
 
 def generate_mix_colors(count: int) -> list[Color]:
@@ -172,16 +176,19 @@ def generate_mix_colors(count: int) -> list[Color]:
     total_colors.extend(distinct_colors)
     total_colors.extend(picked_colors)
     rand.shuffle(total_colors)
-    result: list[NamedColor] = list()
-    for _ in range(count):
-        color = total_colors[rand.randint(0, len(total_colors) - 1)]
-        total_colors.remove(color)
-        result.append(color)
-    return result
+    return total_colors[:count]
 
   
 
 def generate_colors(source: ColorSource, count: int) -> list[Color]:
+    return list(_generate_colors(source, count))
+
+@lru_cache(maxsize=64)
+def _generate_colors(source: ColorSource, count: int) -> tuple[Color, ...]:
+    # generated once per (source, count); randomly generated sources keep their first colors for the process
+    return tuple(_generate_new_colors(source, count))
+
+def _generate_new_colors(source: ColorSource, count: int) -> list[Color]:
     match source:
         case ColorSource.NAME:
             return generate_named_colors(count)
@@ -1,16 +1,35 @@
 from imagecloud.base_logger import BaseLogger, LoggerLevel
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 
 class FileLogger(BaseLogger):
-    def __init__(self, name: str, level: LoggerLevel, log_filepath: str) -> None:
+    def __init__(self, name: str, level: LoggerLevel, log_filepath: str, background_writer: bool = False) -> None:
         super().__init__(name, level)
         self._log_filepath = log_filepath
         self._file_handler = logging.FileHandler(log_filepath)
-        self._logger.addHandler(self._file_handler)
+        self._listener: QueueListener | None = None
+        if background_writer:
+            # messages are queued and written to the file on a listener thread, off the logging thread
+            queue: SimpleQueue = SimpleQueue()
+            self._listener = QueueListener(queue, self._file_handler)
+            self._logger.addHandler(QueueHandler(queue))
+            self._listener.start()
+            atexit.register(self.close)
+        else:
+            self._logger.addHandler(self._file_handler)
+
+    def close(self) -> None:
+        # writes any queued messages before closing the file
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            atexit.unregister(self.close)
+        self._file_handler.close()
             
     @staticmethod
-    def create(name: str, verbose: bool, log_filepath: str) -> BaseLogger:
-        return FileLogger(name, LoggerLevel.DEBUG if verbose else LoggerLevel.INFO, log_filepath)
+    def create(name: str, verbose: bool, log_filepath: str, background_writer: bool = False) -> BaseLogger:
+        return FileLogger(name, LoggerLevel.DEBUG if verbose else LoggerLevel.INFO, log_filepath, background_writer)
 
 
-        
\ No newline at end of file
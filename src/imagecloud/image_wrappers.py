@@ -1,5 +1,11 @@
 import os
+import io
 import csv
+import zipfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, TypeVar
 from PIL import Image
 from imagecloud.size import (
     ResizeType,
@@ -11,15 +17,182 @@ from imagecloud.native.size import (
     native_resize_to_proportionally_fit
 )
 
+class DecodedImageCache:
+    """
+    byte-bounded LRU of decoded images keyed by (filepath, mtime, filesize, member, draft size)
+    lets many generations in one process share the decode of the same source image
+    """
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        self._images: OrderedDict[tuple[str, int, int], Image.Image] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def load(self, image_filepath: str, draft_size: Size | None = None, member: str | None = None) -> Image.Image:
+        key = (
+            *to_file_identity(image_filepath, member),
+            draft_size.image_tuple if draft_size is not None else None
+        )
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+
+        image = decode_image(image_filepath, draft_size, member)
+        image_bytes = to_image_bytes(image)
+        if self._max_bytes < image_bytes:
+            return image
+
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = image
+                self._total_bytes += image_bytes
+            while self._max_bytes < self._total_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._total_bytes -= to_image_bytes(evicted)
+        return image
+
+_decoded_image_cache: DecodedImageCache | None = None
+
+def set_decoded_image_cache(cache: DecodedImageCache | None) -> None:
+    global _decoded_image_cache
+    _decoded_image_cache = cache
+
+def to_image_bytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+def to_file_identity(image_filepath: str, member: str | None = None) -> tuple[str, int, int, str | None]:
+    stat = os.stat(image_filepath)
+    return (os.path.abspath(image_filepath), stat.st_mtime_ns, stat.st_size, member)
+
+def open_image_file(image_filepath: str, member: str | None = None) -> BinaryIO:
+    """
+    binary file of image_filepath, or of the member image stored in the zip file image_filepath
+    """
+    if member is None:
+        return open(image_filepath, 'rb')
+    with zipfile.ZipFile(image_filepath) as bundle:
+        return io.BytesIO(bundle.read(member))
+
+def decode_image(image_filepath: str, draft_size: Size | None = None, member: str | None = None) -> Image.Image:
+    """
+    decode pixels of image_filepath (or its zip member)
+    given a draft_size, formats that support it (JPEG) decode at the smallest scale still covering draft_size
+    other formats ignore draft_size and fully decode
+    """
+    with open_image_file(image_filepath, member) as file, Image.open(file) as image:
+        if draft_size is not None and draft_size.width < image.width and draft_size.height < image.height:
+            image.draft(image.mode, draft_size.image_tuple)
+        image.load()
+    return image
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+def map_images_in_threads(
+    function: Callable[[T], R],
+    values: Iterable[T],
+    image_threads: int
+) -> Iterator[R]:
+    """
+    apply function to each value on a pool of image_threads threads (pillow releases the GIL while decoding)
+    results are yielded in the order of values, with at most 2 * image_threads results held in flight
+    """
+    if image_threads <= 1:
+        for value in values:
+            yield function(value)
+        return
+
+    with ThreadPoolExecutor(max_workers=image_threads) as executor:
+        in_flight = deque()
+        for value in values:
+            in_flight.append(executor.submit(function, value))
+            if 2 * image_threads <= len(in_flight):
+                yield in_flight.popleft().result()
+        while 0 < len(in_flight):
+            yield in_flight.popleft().result()
+
+
+class ImageSource:
+    """
+    header (size and mode) of an image file, or of an image member of a zip file, read without decoding its pixels
+    the header is read on first access when not given, pixels are decoded on demand by `decode`
+    """
+    def __init__(self, filepath: str, size: Size | None = None, mode: str | None = None, member: str | None = None) -> None:
+        self._filepath = filepath
+        self._size = size
+        self._mode = mode
+        self._member = member
+
+    @property
+    def filepath(self) -> str:
+        return self._filepath
+
+    @property
+    def member(self) -> str | None:
+        return self._member
+
+    @property
+    def width(self) -> int:
+        return self.size.width
+
+    @property
+    def height(self) -> int:
+        return self.size.height
+
+    @property
+    def size(self) -> Size:
+        if self._size is None:
+            self._read_header()
+        return self._size
+
+    @property
+    def mode(self) -> str:
+        if self._mode is None:
+            self._read_header()
+        return self._mode
+
+    def _read_header(self) -> None:
+        # Image.open only parses the header, the file is closed before any pixel decode
+        with open_image_file(self._filepath, self._member) as file, Image.open(file) as image:
+            self._size = Size(image.width, image.height)
+            self._mode = image.mode
+
+    def identity(self) -> tuple[str, int, int, str | None]:
+        return to_file_identity(self._filepath, self._member)
+
+    def open_file(self) -> BinaryIO:
+        return open_image_file(self._filepath, self._member)
+
+    def decode(self, draft_size: Size | None = None) -> Image.Image:
+        if _decoded_image_cache is not None:
+            return _decoded_image_cache.load(self.filepath, draft_size, self._member)
+        return decode_image(self.filepath, draft_size, self._member)
+
+    @staticmethod
+    def open(image_filepath: str):
+        result = ImageSource(image_filepath)
+        result._read_header()
+        return result
+
+
 class NamedImage:
     
-    def __init__(self, image: Image.Image, name: str | None = None, original_image: Image.Image | None = None) -> None:
+    def __init__(self, image: Image.Image | ImageSource, name: str | None = None, original_image: Image.Image | ImageSource | None = None) -> None:
         self._original_image = original_image if original_image is not None else image
         self._image = image
         self._name = name if name is not None else ''
     
     @property
     def image(self) -> Image.Image:
+        if isinstance(self._image, ImageSource):
+            self._image = self._image.decode()
         return self._image
     
     @property
@@ -29,30 +202,55 @@ class NamedImage:
     @property
     def size(self) -> Size:
         return Size(self._image.width, self._image.height)
+
+    @property
+    def source(self) -> ImageSource | None:
+        return self._image if isinstance(self._image, ImageSource) else None
     
+    @property
+    def original(self) -> Image.Image | ImageSource:
+        return self._original_image
+
     @property
     def original_named_image(self):
         return NamedImage(self._original_image, self.name)
     
+    def decode(self, draft_size: Size | None = None) -> Image.Image:
+        """
+        pixels of this image, decoded from source without retaining them if not yet decoded
+        draft_size lets the decoder skip resolution above it (may return an image larger than draft_size)
+        """
+        if isinstance(self._image, ImageSource):
+            return self._image.decode(draft_size)
+        return self._image
+
     def show(self) -> None:
         self.image.show(self.name)
 
     @staticmethod
     def load(image_filepath: str):
         name = os.path.splitext(os.path.basename(image_filepath))[0]
-        image = Image.open(image_filepath)
-        return NamedImage(image, name)
+        return NamedImage(ImageSource.open(image_filepath), name)
 
 class WeightedImage(NamedImage, WeightedSize):
-    
-    def __init__(self, weight: float, image: Image.Image, name: str | None = None, original_image: Image.Image | None = None) -> None:
+    """
+    weighted image whose weighted size (width, height) defaults to the image size
+    a different size makes it a size-only record of how big the image will be rendered; pixels are untouched
+    """
+    def __init__(self, weight: float, image: Image.Image | ImageSource, name: str | None = None, original_image: Image.Image | ImageSource | None = None, size: Size | None = None) -> None:
         super().__init__(image=image, name=name, original_image=original_image)
-        WeightedSize.__init__(self, weight=weight, width=image.width, height=image.height)
+        size = size if size is not None else Size(image.width, image.height)
+        WeightedSize.__init__(self, weight=weight, width=size.width, height=size.height)
+
+    @property
+    def size(self) -> Size:
+        # the weighted size, not the size of the image it may only be a record for
+        return Size(self.width, self.height)
 
     @staticmethod
     def load(weight: float, image_filepath: str):
         named_image = NamedImage.load(image_filepath)
-        return WeightedImage(weight, named_image.image, named_image.name)
+        return WeightedImage(weight, named_image.source, named_image.name)
         
 
 
@@ -83,13 +281,15 @@ def resize_images_to_proportionally_fit(
         step_size,
         margin
     )
+    # only sizes are needed for placement, the single resample happens when the layout is rendered
     result: list[WeightedImage] = list()
     for i in range(len(weighted_images)):
         result.append(WeightedImage(
             weighted_images[i].weight, 
-            weighted_images[i].image.resize(WeightedSize.from_native(weighted_sizes[i]).image_tuple),
+            weighted_images[i].original,
             weighted_images[i].name,
-            weighted_images[i].original_named_image.image
+            weighted_images[i].original,
+            WeightedSize.from_native(weighted_sizes[i])
         ))
     return result
         
@@ -104,14 +304,18 @@ WEIGHTED_IMAGES_CSV_FILE_HELP = '''csv file for weighted images with following f
 
 '''.format(WEIGHTED_IMAGE_IMAGE_FILEPATH, WEIGHTED_IMAGE_WEIGHT)
 
-def load_weighted_images(csv_filepath: str) -> list[WeightedImage]:
+def load_weighted_images(csv_filepath: str, image_threads: int = 1) -> list[WeightedImage]:
     try:
-        result: list[WeightedImage] = list()
+        rows: list[tuple[float, str]] = list()
         with open(csv_filepath, 'r') as file:    
             csv_reader = csv.DictReader(file, fieldnames=[WEIGHTED_IMAGE_IMAGE_FILEPATH, WEIGHTED_IMAGE_WEIGHT])
             next(csv_reader)
             for row in csv_reader:
-                result.append(WeightedImage.load(float(row[WEIGHTED_IMAGE_WEIGHT]), row[WEIGHTED_IMAGE_IMAGE_FILEPATH]))
-        return result
+                rows.append((float(row[WEIGHTED_IMAGE_WEIGHT]), row[WEIGHTED_IMAGE_IMAGE_FILEPATH]))
+        return list(map_images_in_threads(
+            lambda row: WeightedImage.load(row[0], row[1]),
+            rows,
+            image_threads
+        ))
     except Exception as e:
         raise Exception(str(e))
@@ -1,13 +1,15 @@
 from imagecloud.base_logger import BaseLogger
+from imagecloud.logger_level import LoggerLevel
 from PIL import Image
 from random import Random
 import warnings
 import numpy as np
 from imagecloud.size import (Size, ResizeType)
 from imagecloud.parsers import (parse_to_float, parse_to_int)
-from imagecloud.reservations import (Reservations, SampledUnreservedOpening)
+from imagecloud.reservations import (Reservations, SampledUnreservedOpening, SamplingCounters, SAMPLING_COUNTERS)
 from imagecloud.image_wrappers import (WeightedImage, sort_by_weight, resize_images_to_proportionally_fit)
 from imagecloud.time_measure import TimeMeasure
+from imagecloud.metrics import (Metrics, TRIAL_COUNTER_PREFIX)
 import imagecloud.imagecloud_defaults as helper
 from imagecloud.layout import (
     LayoutContour,
@@ -70,6 +72,10 @@ class ImageCloud(object):
     mode : string (default=helper.DEFAULT_MODE)
         Transparent background will be generated when mode is "RGBA" and
         background_color is None.
+
+    metrics : Metrics or None (default=None)
+        Collector of the sizing, scan, reserve and maximize phases, counters
+        and per image histograms. If None, a collector of its own is used.
     """
     def __init__(self,
                  logger: BaseLogger,
@@ -87,7 +93,8 @@ class ImageCloud(object):
                  margin: int | None = None,
                  mode: str | None = None,
                  name: str | None = None,
-                 total_threads: int | None = None
+                 total_threads: int | None = None,
+                 metrics: Metrics | None = None
     ) -> None:
         self._mask: np.ndarray | None = np.array(mask) if mask is not None else None
         self._size = size if size is not None else Size.parse(helper.DEFAULT_CLOUD_SIZE)
@@ -108,8 +115,13 @@ class ImageCloud(object):
         self._random_state = None
         self._name = name if name is not None else 'imagecloud'
         self._total_threads = total_threads if total_threads is not None else parse_to_int(helper.DEFAULT_TOTAL_THREADS)
+        self._metrics = metrics if metrics is not None else Metrics(self._name, logger.tracer)
         self.layout_: Layout | None = None
 
+    @property
+    def metrics(self) -> Metrics:
+        return self._metrics
+
     @property
     def mask(self) -> np.ndarray | None:
         return self._mask
@@ -148,16 +160,17 @@ class ImageCloud(object):
         weighted_images = sort_by_weight(weighted_images, True)[:self._max_images]
         resize_count = 0
         imagecloud_size = self.size
-        self._logger.info('Generating ImageCloud from {0} images'.format(len(weighted_images)))
+        self._logger.info('Generating ImageCloud from {0} images', len(weighted_images))
         self._logger.push_indent('generating')
 
-        proportional_images = resize_images_to_proportionally_fit(
-            weighted_images,
-            imagecloud_size,
-            self.resize_type,
-            self.image_step,
-            self._margin
-        )
+        with self._metrics.phase('sizing'):
+            proportional_images = resize_images_to_proportionally_fit(
+                weighted_images,
+                imagecloud_size,
+                self.resize_type,
+                self.image_step,
+                self._margin
+            )
         measure = TimeMeasure()
         measure.start()
         while True:
@@ -187,25 +200,27 @@ class ImageCloud(object):
                     cloud_expansion_step_size, 
                     self.resize_type
                 )
-                self._logger.info('Expanded ImageCloud ({0} -> {1}) for dropped images ({2}/{3})'.format(
+                self._logger.info('Expanded ImageCloud ({0} -> {1}) for dropped images ({2}/{3})',
                     imagecloud_size.size_to_string(),
                     new_imagecloud_size.size_to_string(),
                     (len(weighted_images) - len(result.items)),
                     len(weighted_images)
-                ))
+                )
                 imagecloud_size = new_imagecloud_size
                 
-                self._logger.push_indent('expanded-imagecloud-{0}'.format(resize_count))
+                self._logger.push_indent('expanded-imagecloud-{0}', resize_count)
                 continue
             break
 
         measure.stop()
         self._logger.pop_indent()
-        self._logger.info('Generated: {0}/{1} images ({2})'.format(
+        self._logger.info('Generated: {0}/{1} images ({2}) fill({3:.3f}) {4}',
             len(result.items),
             len(proportional_images),
-            measure.latency_str()
-        ))
+            measure.latency_str(),
+            np.count_nonzero(result.canvas.reservation_map) / result.canvas.reservation_map.size,
+            result.sampling_counters.counters_to_string()
+        )
         self._logger.reset_context()
 
         return result
@@ -220,7 +235,7 @@ class ImageCloud(object):
         new_items: list[LayoutItem] = list()
         
         total_images = len(layout.items)
-        self._logger.info('Maximizing ImageCloud empty-space around  {0} images'.format(total_images))
+        self._logger.info('Maximizing ImageCloud empty-space around  {0} images', total_images)
         self._logger.push_indent('maximizing-empty-space')
         measure = TimeMeasure()
         measure.start()
@@ -230,22 +245,25 @@ class ImageCloud(object):
             item: LayoutItem = layout.items[i]
             image_measure = TimeMeasure()
             image_measure.start()
-            self._logger.push_indent('image-{0}[{1}/{2}]'.format(item.name, total_images - i, total_images))
-            self._logger.info('Maximizing...')
-            new_reservation_box = reservations.maximize_existing_reservation(item.reservation_box)
+            self._logger.push_indent('image-{0}[{1}/{2}]', item.name, total_images - i, total_images)
+            self._logger.debug('Maximizing...')
+            with self._metrics.phase('maximize'):
+                new_reservation_box = reservations.maximize_existing_reservation(item.reservation_box)
             image_measure.stop()
+            self._metrics.observe('maximize_ms', image_measure.latency_ns() / 1000000)
             if item.reservation_box.equals(new_reservation_box):
-                self._logger.info('Already Maximized ({0})'.format(image_measure.latency_str()))
+                self._logger.debug('Already Maximized ({0})', image_measure.latency_str())
                 new_items.append(item)
                 self._logger.pop_indent()
                 continue
-            self._logger.info('Maximized {0} -> {1} ({0})'.format(
+            self._logger.debug('Maximized {0} -> {1} ({2})',
                 item.reservation_box.size.size_to_string(),
                 new_reservation_box.size.size_to_string(),
                 image_measure.latency_str()
-            ))
+            )
             margin = 2 * (item.reservation_box.left - item.placement_box.left)
-            reservations.reserve_opening(item.original_image.name, item.reservation_no, new_reservation_box)
+            with self._metrics.phase('reserve'):
+                reservations.reserve_opening(item.original_image.name, item.reservation_no, new_reservation_box)
             new_items.append(
                 LayoutItem(
                     item.original_image,
@@ -257,20 +275,20 @@ class ImageCloud(object):
                 )
             )
             maximized_count += 1
-            self._logger.info('resized {0} -> {1}. ({2})'.format(
+            self._logger.debug('resized {0} -> {1}. ({2})',
                 item.reservation_box.box_to_string(),
                 new_reservation_box.box_to_string(),
-                image_measure.latency_str(),
-            ))
+                image_measure.latency_str()
+            )
             self._logger.pop_indent()
 
         measure.stop()
         self._logger.pop_indent()
-        self._logger.info('Maximized {0}/{1} images ({2})'.format(
+        self._logger.info('Maximized {0}/{1} images ({2})',
             maximized_count,
             len(new_items),
             measure.latency_str()
-        ))    
+        )    
 
         new_items.reverse()
         self.layout_ = Layout(
@@ -295,7 +313,9 @@ class ImageCloud(object):
             layout.margin,
             layout.name + '.maximized',
             self._total_threads,
-            measure.latency_str()
+            measure.latency_str(),
+            layout.render_cache,
+            layout.sampling_counters
         )
         self._logger.reset_context()
 
@@ -305,7 +325,8 @@ class ImageCloud(object):
                 proportional_images: list[WeightedImage],
                 imagecloud_size: Size,
                 random_state: Random,              
-                max_image_size: Size | None
+                max_image_size: Size | None,
+                trial: bool = False
     ) -> Layout: 
 
         if len(proportional_images) <= 0:
@@ -327,12 +348,14 @@ class ImageCloud(object):
                 # we only have one word. We make it big!
                 sizes = [self._size]
             else:
-                layout = self._generate(
-                    proportional_images[:2],
-                    imagecloud_size,
-                    random_state,
-                    self._size
-                )
+                with self._metrics.phase('sizing'):
+                    layout = self._generate(
+                        proportional_images[:2],
+                        imagecloud_size,
+                        random_state,
+                        self._size,
+                        True
+                    )
                 # find image sizes
                 sizes = [x.placement_box.size for x in layout.items]
             
@@ -350,44 +373,62 @@ class ImageCloud(object):
                 max_image_size = sizes[0]
 
         generation_measure = TimeMeasure()
+        sampling_counters = SamplingCounters()
+        counter_prefix = TRIAL_COUNTER_PREFIX if trial else ''
         # find best location for each image
         total = len(proportional_images)
         generation_measure.start()
         for index in range(total):
             weight = proportional_images[index].weight
-            image = proportional_images[index].image
+            image_size = Size(proportional_images[index].width, proportional_images[index].height)
             name = proportional_images[index].name
             measure = TimeMeasure()
             measure.start()
-            self._logger.push_indent('image-{0}[{1}/{2}]'.format(name, index + 1, total))
+            self._logger.push_indent('image-{0}[{1}/{2}]', name, index + 1, total)
 
             if weight == 0:
-                self._logger.info('Dropping 0 weight'.format(
-                    index+1, total, name
-                ))
+                self._logger.info('Dropping 0 weight')
+                self._metrics.count(counter_prefix + 'drops')
                 self._logger.pop_indent()
                 continue
 
-            self._logger.info('Finding position in ImageCloud')
+            self._logger.debug('Finding position in ImageCloud')
             
-            sampled_result: SampledUnreservedOpening = reservations.sample_to_find_unreserved_opening(
-                Size(image.width, image.height),
-                self._min_image_size,
-                self._margin,
-                self._resize_type,
-                self._image_step
-            )
+            # traced as the sampling span, holding the native scan spans
+            with self._metrics.phase('scan', 'sampling'):
+                sampled_result: SampledUnreservedOpening = reservations.sample_to_find_unreserved_opening(
+                    image_size,
+                    self._min_image_size,
+                    self._margin,
+                    self._resize_type,
+                    self._image_step
+                )
             measure.stop()
+            self._metrics.count(counter_prefix + 'scans')
+            self._metrics.count(counter_prefix + 'samplings', sampled_result.sampling_total)
+            for counter in SAMPLING_COUNTERS:
+                self._metrics.count(counter_prefix + counter, getattr(sampled_result.counters, counter))
+            if not trial:
+                self._metrics.observe('samplings', sampled_result.sampling_total)
+                self._metrics.observe('scan_ms', measure.latency_ns() / 1000000)
+                self._metrics.observe('cells_read', sampled_result.counters.cells_read)
+            sampling_counters.add(sampled_result.counters)
+            # guarded: fill_ratio counts the nonzero cells of the whole reservation map, too costly per image unless debugging
+            if self._logger.is_enabled(LoggerLevel.DEBUG):
+                self._logger.debug('Sampled at fill({0:.3f}): {1}', reservations.fill_ratio, sampled_result.counters.counters_to_string())
             if sampled_result.found:
-                self._logger.info('Found position: samplings({0}), orientation ({1}), resize({2}->{3}) ({4})'.format(
+                self._logger.debug('Found position: samplings({0}), orientation ({1}), resize({2}->{3}) ({4})',
                     sampled_result.sampling_total,
                     sampled_result.orientation.name if sampled_result.orientation is not None else None,
-                    Size(image.width, image.height).size_to_string(),
+                    image_size.size_to_string(),
                     sampled_result.new_size.size_to_string(),
                     measure.latency_str()
-                ))
+                )
+                if sampled_result.orientation is not None:
+                    self._metrics.count(counter_prefix + 'rotations')
                 reservation_no = index + 1
-                reservations.reserve_opening(name, reservation_no, sampled_result.opening_box)
+                with self._metrics.phase('reserve'):
+                    reservations.reserve_opening(name, reservation_no, sampled_result.opening_box)
                 layout_items.append(LayoutItem(
                     proportional_images[index],
                     sampled_result.actual_box,
@@ -397,13 +438,14 @@ class ImageCloud(object):
                     measure.latency_str()
                 ))
             else:
-                self._logger.info('Dropping image: samplings({0}). {1} resize({2} -> {3}) ({4})'.format(
+                self._metrics.count(counter_prefix + 'drops')
+                self._logger.info('Dropping image: samplings({0}). {1} resize({2} -> {3}) ({4})',
                     sampled_result.sampling_total,
                     'Image resized too small' if sampled_result.new_size.is_less_than(self._min_image_size) else '',
-                    Size(image.width, image.height).size_to_string(),
+                    image_size.size_to_string(),
                     sampled_result.new_size.size_to_string(),
                     measure.latency_str()
-                ))
+                )
                 
                     
             self._logger.pop_indent()
@@ -431,7 +473,8 @@ class ImageCloud(object):
             self._margin,
             self._name + '.layout',
             self._total_threads,
-            generation_measure.latency_str()
+            generation_measure.latency_str(),
+            sampling_counters=sampling_counters
         )
         return self.layout_
 
@@ -458,7 +501,8 @@ class ImageCloud(object):
     @staticmethod
     def create(
         layout: Layout,
-        logger: BaseLogger
+        logger: BaseLogger,
+        metrics: Metrics | None = None
     ):
         result = ImageCloud(
             logger,
@@ -475,7 +519,8 @@ class ImageCloud(object):
             layout.contour.color,
             layout.margin,
             layout.canvas.mode,
-            layout.canvas.name
+            layout.canvas.name,
+            metrics=metrics
         )
         result.layout_ = layout
         return result
\ No newline at end of file
@@ -1,4 +1,5 @@
 from imagecloud.size import ResizeType
+from PIL import Image
 DEFAULT_IMAGE_FORMAT = 'png'
 DEFAULT_CLOUD_SIZE = '400,200'
 DEFAULT_RESIZE_TYPE = 'MAINTAIN_ASPECT_RATIO'
@@ -94,3 +95,52 @@ MODE_HELP = 'Transparent background will be generated when mode is "RGBA" and ba
 DEFAULT_TOTAL_THREADS = '1'
 TOTAL_THREADS_HELP = '''Experimental, using parallel algorithms with thread-allocations to accomplish image-cloud generation.  Value is the number of threads-of-execution to commit to generation.  A value of 1 will execute sequentially (not experimental); uses no parallel algorithms.
 '''
+DEFAULT_IMAGE_THREADS = '4'
+IMAGE_THREADS_HELP = '''Number of threads used to read and decode images while loading and rendering.  A value of 1 reads and decodes sequentially.
+'''
+DEFAULT_THUMBNAIL_CACHE_MB = '512'
+THUMBNAIL_CACHE_DIRECTORY_HELP = '''Directory of rendered images kept between runs.
+Images rendered before at the same (or up to 2x larger) size are reused instead of decoded and resampled again.
+'''
+THUMBNAIL_CACHE_MB_HELP = 'Megabytes the thumbnail cache directory may use before least recently used thumbnails are removed.'
+# memory prepared item images of a layout (and the layouts derived from it) may use between renders
+DEFAULT_RENDER_CACHE_MB = '256'
+DEFAULT_RESAMPLE = 'BICUBIC'
+RESAMPLE_TYPES = [member.name for member in Image.Resampling]
+RESAMPLE_HELP = '''Resample filter used when resizing images into the imagecloud.
+NEAREST, BOX or BILINEAR render previews fastest, LANCZOS gives the best quality for final output.
+'''
+DEFAULT_COMPOSITOR = 'NUMPY'
+COMPOSITOR_TYPES = ['PIL', 'NUMPY']
+COMPOSITOR_HELP = '''How resized images are composited into the imagecloud canvas.
+NUMPY writes images into one shared canvas buffer from all image_threads (L, RGB, RGBA and CMYK canvases).
+PIL pastes images one at a time, and is used for any other canvas mode.
+'''
+DEFAULT_RESERVATION_CHART_BACKEND = 'PIL'
+RESERVATION_CHART_BACKENDS = ['PIL', 'MATPLOTLIB']
+RESERVATION_CHART_BACKEND_HELP = '''How the imagecloud reservation chart (reservation map with a legend of its images) is drawn.
+PIL draws the map and legend panel directly. MATPLOTLIB draws them with matplotlib, which must be installed.
+'''
+DEFAULT_TILE_HEIGHT = '0'
+TILE_HEIGHT_HELP = '''Rows of the imagecloud composited and written to png output at a time, bounding memory to tile_height rows of the canvas.
+0 composites the whole imagecloud in memory. Only used for png output of L, RGB and RGBA canvases.
+'''
+DEFAULT_RESERVATION_MAP_FORMAT = 'npy'
+RESERVATION_MAP_FORMATS = ['npy', 'npz', 'csv', 'none']
+RESERVATION_MAP_FORMAT_HELP = '''File format of the reservation map written with a layout.
+npy is binary and memory-mapped when loaded, npz is compressed, csv is text. Layouts with any of these formats can be loaded.
+none writes no map, it is rebuilt from the item reservations when the layout is loaded.
+'''
+DEFAULT_LAYOUT_IMAGES = 'asset'
+LAYOUT_IMAGES = ['asset', 'reference']
+LAYOUT_IMAGES_HELP = '''How a written layout refers to its images.
+asset stores each image once, named by its content, in the layout_assets directory next to the layout (shared by all layouts written there).
+reference refers to the original image files where they have one (images without a file are stored as assets).
+'''
+DEFAULT_LAYOUT_FORMAT = 'csv'
+LAYOUT_FORMATS = ['csv', 'bundle']
+LAYOUT_FORMAT_HELP = '''File format of a written layout.
+csv writes the layout csv with its reservation map, contour mask and images as separate files (for interchange).
+bundle writes one .zip file holding the layout table, reservation map, contour mask and each distinct image (always stored in it).
+Layouts of either format can be loaded.
+'''
@@ -1,44 +1,97 @@
 from imagecloud.base_logger import BaseLogger
-from imagecloud.image_wrappers import NamedImage
+from imagecloud.image_wrappers import (NamedImage, map_images_in_threads)
 from imagecloud.size import (Size, ResizeType, RESIZE_TYPES)
 from imagecloud.box import Box
 from imagecloud.reservations import (
     Reservations,
     ReservationMapType, 
-    ReservationMapDataType
+    ReservationMapDataType,
+    SamplingCounters
 )
 import imagecloud.imagecloud_defaults as helper
-from imagecloud.parsers import to_unused_filepath
+from imagecloud.thumbnail_cache import ThumbnailCache
+from imagecloud.png_strip_writer import PNGStripWriter
+from imagecloud.reservation_chart import draw_reservation_chart
+from imagecloud.render_plan import (RenderStep, RenderPlanCache)
+from imagecloud.metrics import Metrics
+from imagecloud.layout_storage import (
+    LayoutDirectory,
+    LayoutBundle,
+    BUNDLE_LAYOUT_MEMBER,
+    is_bundle_filepath
+)
 import numpy as np
-import matplotlib.patches as mpatches
-import matplotlib.pyplot as plt
 import io
+import math
 import os
+import time
 from PIL import Image, ImageFilter
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterator
 import csv
+from collections import OrderedDict
+from functools import lru_cache
 import traceback
 from imagecloud.colors import (
     Color,
     ColorSource,
     generate_colors,
-    to_ImagePalette
+    to_ImagePalette,
+    to_rgb_lut
 )
 
+# orientations that swap width and height
+TRANSPOSED_ORIENTATIONS = [
+    Image.Transpose.ROTATE_90,
+    Image.Transpose.ROTATE_270,
+    Image.Transpose.TRANSPOSE,
+    Image.Transpose.TRANSVERSE
+]
+# resize first reduces by an integer factor (Image.reduce) down to this multiple of the target size
+RESIZE_REDUCING_GAP = 3.0
+# contours (of different output sizes) each LayoutContour keeps
+CONTOUR_CACHE_SIZE = 4
+# passes of box blur Pillow's GaussianBlur (and the float contour blur) approximates a gaussian with
+GAUSSIAN_BLUR_PASSES = 3
+# canvas modes the NUMPY compositor supports, and the mode its buffer is wrapped as (pillow shares memory with these raw modes)
+NUMPY_COMPOSITE_MODES = {
+    'L': 'L',
+    'RGB': 'RGBX',
+    'RGBA': 'RGBA',
+    'CMYK': 'CMYK'
+}
+
 def is_empty(value: str | None) -> bool:
     return value in ['', None]
 
-def to_existing_filepath(original_filepath: str, possible_dirnames: list[str] | str) -> str:
-    basename = os.path.basename(original_filepath)
-    possible_dirnames = [os.path.dirname(original_filepath), *possible_dirnames]
-    tried_filepaths: list[str] = list()
-    for dirname in possible_dirnames:
-        filepath = os.path.join(dirname, basename)
-        if os.path.exists(filepath):
-            return filepath
-        tried_filepaths.append(filepath)
-    
-    raise ValueError('The file {0} does not exist! (Tried [{1}])'.format(original_filepath, ', '.join(tried_filepaths)))
+def write_tile(buffer: np.ndarray, buffer_upper: int, box: Box, tile: np.ndarray) -> None:
+    # replace the pixels of box (canvas coordinates) with tile, as pasting without a mask does, in the buffer holding canvas rows from buffer_upper
+    # clipped to the box and buffer as paste clips; rounding can also leave the box a pixel off the resized image
+    upper = max(box.upper, buffer_upper)
+    left = max(box.left, 0)
+    lower = min(box.lower, box.upper + tile.shape[0], buffer_upper + buffer.shape[0])
+    right = min(box.right, box.left + tile.shape[1], buffer.shape[1])
+    if lower <= upper or right <= left:
+        return
+    tile = tile[upper - box.upper:lower - box.upper, left - box.left:right - box.left]
+    region = buffer[upper - buffer_upper:lower - buffer_upper, left:right]
+    if tile.ndim == 3:
+        region[..., :tile.shape[2]] = tile
+    else:
+        region[...] = tile
+
+def to_overlapping_indexes(boxes: list[Box]) -> set[int]:
+    # placement boxes of maximized layouts can overlap their neighbors by the removed margin
+    result: set[int] = set()
+    by_left = sorted(range(len(boxes)), key=lambda i: boxes[i].left)
+    for n in range(len(by_left)):
+        i = by_left[n]
+        for m in range(n + 1, len(by_left)):
+            j = by_left[m]
+            if boxes[i].right <= boxes[j].left:
+                break
+            if boxes[i].upper < boxes[j].lower and boxes[j].upper < boxes[i].lower:
+                result.update([i, j])
+    return result
     
     
   
@@ -48,15 +101,16 @@ class LayoutCanvas:
         size: Size,
         mode: str,
         background_color: str | None,
-        reservation_map: ReservationMapType | None,
+        reservation_map: ReservationMapType | Callable[[], ReservationMapType] | None,
         name: str | None = None
     ) -> None:
         self._name = name if name else 'imagecloud'
         self._size = size
         self._mode = mode
         self._background_color = background_color
-        self._reservation_map: ReservationMapType = reservation_map if reservation_map is not None else np.zeros(size, dtype=ReservationMapDataType)
-        self._reservation_colors = [*generate_colors(ColorSource.PICKED, self._reservation_map.max() + 1)]
+        # a callable loads the map on first access
+        self._reservation_map = reservation_map
+        self._reservation_colors: list[Color] | None = None
 
     
     @property
@@ -79,12 +133,27 @@ class LayoutCanvas:
     def background_color(self) -> str | None:
         return self._background_color
     
+    @property
+    def has_reservation_map(self) -> bool:
+        return self._reservation_map is not None
+
     @property
     def reservation_map(self) -> ReservationMapType:
+        if self._reservation_map is None:
+            self._reservation_map = np.zeros(self.size.nd_shape, dtype=ReservationMapDataType)
+        elif callable(self._reservation_map):
+            self._reservation_map = self._reservation_map()
         return self._reservation_map
+
+    @reservation_map.setter
+    def reservation_map(self, reservation_map: ReservationMapType | Callable[[], ReservationMapType]) -> None:
+        self._reservation_map = reservation_map
+        self._reservation_colors = None
     
     @property
     def reservation_colors(self) -> list[Color]:
+        if self._reservation_colors is None:
+            self._reservation_colors = [*generate_colors(ColorSource.PICKED, self.reservation_map.max() + 1)]
         return self._reservation_colors
     
     def to_image(self, scale: float = 1.0) -> NamedImage:
@@ -94,35 +163,52 @@ class LayoutCanvas:
             self.background_color
         )
         return NamedImage(image, self.name)
+
+    def to_array(self, scale: float = 1.0, height: int | None = None) -> np.ndarray:
+        buffer_mode = NUMPY_COMPOSITE_MODES[self.mode]
+        size = self.size.scale(scale)
+        background = np.asarray(Image.new(self.mode, (1, 1), self.background_color).convert(buffer_mode))
+        buffer = np.empty((height if height is not None else size.height, size.width, *background.shape[2:]), dtype=np.uint8)
+        buffer[...] = background[0, 0]
+        return buffer
+
+    def from_array(self, buffer: np.ndarray) -> NamedImage:
+        buffer_mode = NUMPY_COMPOSITE_MODES[self.mode]
+        image = Image.frombuffer(buffer_mode, (buffer.shape[1], buffer.shape[0]), buffer, 'raw', buffer_mode, 0, 1)
+        if buffer_mode != self.mode:
+            image = image.convert(self.mode)
+        return NamedImage(image, self.name)
+
+    def to_mode_array(self, buffer: np.ndarray) -> np.ndarray:
+        # drop the padding channel of RGBX buffers
+        if NUMPY_COMPOSITE_MODES[self.mode] != self.mode:
+            return buffer[..., :len(self.mode)]
+        return buffer
     
     def to_reservation_image(self) -> NamedImage:
-        image = Image.new(
-            'P',
-            (self.reservation_map.shape[1], self.reservation_map.shape[0])
-        )
-        image.putpalette(to_ImagePalette(self.reservation_colors))
-        pixels = image.load()
-        for y in range(self.reservation_map.shape[0]):
-            for x in range(self.reservation_map.shape[1]):
-                pixels[x, y] = int(self.reservation_map[y,x])
+        reservation_map = np.asarray(self.reservation_map)
+        if len(self.reservation_colors) <= 256:
+            # reservation numbers are the palette indexes
+            image = Image.fromarray(reservation_map.astype(np.uint8), 'P')
+            image.putpalette(to_ImagePalette(self.reservation_colors))
+        else:
+            # more reservations than a palette holds, color them through an rgb lookup table
+            image = Image.fromarray(to_rgb_lut(self.reservation_colors)[reservation_map], 'RGB')
         
         return NamedImage(image, '{0}.reservation_map'.format(self.name))
     
-    def write(self, layout_directory: str) -> Dict[str,Any]:
-        reservation_map_csv_filepath = to_unused_filepath(layout_directory, '{0}.reservation_map'.format(self.name), 'csv')
-        np.savetxt(
-            fname=reservation_map_csv_filepath,
-            X=self._reservation_map,
-            fmt='%d',
-            delimiter=','
-        )
+    def write(self, storage: LayoutDirectory | LayoutBundle, reservation_map_format: str = helper.DEFAULT_RESERVATION_MAP_FORMAT) -> Dict[str,Any]:
+        reservation_map_filepath = ''
+        # map-free layouts rebuild the map from their item reservations when loaded
+        if reservation_map_format != 'none':
+            reservation_map_filepath = storage.write_reservation_map('{0}.reservation_map'.format(self.name), self.reservation_map, reservation_map_format)
         return {
             LAYOUT_CANVAS_NAME: self.name,
             LAYOUT_CANVAS_MODE: self.mode,
             LAYOUT_CANVAS_BACKGROUND_COLOR: self.background_color if self.background_color is not None else '',
             LAYOUT_CANVAS_SIZE_WIDTH: self.size.width,
             LAYOUT_CANVAS_SIZE_HEIGHT: self.size.height,
-            LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH: reservation_map_csv_filepath
+            LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH: reservation_map_filepath
         }
 
     @staticmethod
@@ -130,7 +216,7 @@ class LayoutCanvas:
         return { header:'' for header in LAYOUT_CANVAS_HEADERS }
 
     @staticmethod
-    def load(row: Dict[str,Any], _row_no: int, layout_directory: str):
+    def load(row: Dict[str,Any], _row_no: int, storage: LayoutDirectory | LayoutBundle):
         if all([is_empty(row[header])  for header in LAYOUT_CANVAS_HEADERS]): 
             return None
         
@@ -138,28 +224,96 @@ class LayoutCanvas:
             Size(int(row[LAYOUT_CANVAS_SIZE_WIDTH]), int(row[LAYOUT_CANVAS_SIZE_HEIGHT])),
             row[LAYOUT_CANVAS_MODE],
             row[LAYOUT_CANVAS_BACKGROUND_COLOR] if not(is_empty(row[LAYOUT_CANVAS_BACKGROUND_COLOR])) else None,
-            np.loadtxt(
-                fname=to_existing_filepath(row[LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH], layout_directory),
-                dtype=ReservationMapDataType,
-                delimiter=','
-            ) if not(is_empty(row[LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH])) else None,
+            storage.to_reservation_map_loader(row[LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH]) if not(is_empty(row[LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH])) else None,
             row[LAYOUT_CANVAS_NAME] if not(is_empty(row[LAYOUT_CANVAS_NAME])) else None
         )
 
+def _to_box_blur(values: np.ndarray, radius: float, axis: int) -> np.ndarray:
+    """
+    box blur along axis with a fractional radius (edges extended), as a pass of Pillow's GaussianBlur
+    """
+    whole = int(radius)
+    part = radius - whole
+    values = np.moveaxis(values, axis, -1)
+    length = values.shape[-1]
+    padded = np.pad(values, [(0, 0)] * (values.ndim - 1) + [(whole + 1, whole + 1)], mode='edge')
+    sums = np.cumsum(padded, axis=-1, dtype=np.float64)
+    inner = sums[..., 2 * whole + 1:2 * whole + 1 + length] - sums[..., :length]
+    outer = padded[..., :length] + padded[..., 2 * whole + 2:2 * whole + 2 + length]
+    return np.moveaxis(((inner + part * outer) / (2 * radius + 1)).astype(np.float32), -1, axis)
+
+
+def _to_gaussian_blur(values: np.ndarray, radius: float) -> np.ndarray:
+    """
+    float gaussian blur of standard deviation radius, by the extended box blurs Pillow's GaussianBlur uses
+    """
+    values = values.astype(np.float32)
+    if radius <= 0:
+        return values
+    variance = radius * radius / GAUSSIAN_BLUR_PASSES
+    whole = math.floor((math.sqrt(12 * variance + 1) - 1) / 2)
+    part = (2 * whole + 1) * (whole * (whole + 1) - 3 * variance) / (6 * (variance - (whole + 1) * (whole + 1)))
+    for axis in [1, 0]:
+        for _ in range(GAUSSIAN_BLUR_PASSES):
+            values = _to_box_blur(values, whole + part, axis)
+    return values
+
+
+def _to_edge_contour(mask: Image.Image, size: Size, radius: float) -> np.ndarray:
+    """
+    full resolution contour: mask edges found and blurred at size, drawn wherever the blur reaches
+    """
+    contour = np.array(mask.resize(size.image_tuple).filter(ImageFilter.FIND_EDGES))
+    # make sure borders are not drawn before changing width
+    contour[[0, -1], :] = 0
+    contour[:, [0, -1]] = 0
+    return np.array(Image.fromarray(contour).filter(ImageFilter.GaussianBlur(radius=radius)))
+
+
+@lru_cache(maxsize=64)
+def _to_contour_band(reduction: float, radius: float) -> tuple[float, float]:
+    """
+    (lower, upper) blurred mask values, reduction times upscaled, between which the full resolution contour is drawn.
+    Taken from a straight mask edge at both resolutions, so the contour keeps the full resolution width and position.
+    """
+    side = math.ceil(4 * radius / reduction) + 8
+    edge = np.zeros((3, 2 * side), np.uint8)
+    edge[:, side:] = 255
+    full_width = round(2 * side * reduction)
+    # tall enough that the blur does not reach the undrawn borders from the middle row
+    full_height = 2 * math.ceil(4 * radius) + 3
+    drawn = np.flatnonzero(_to_edge_contour(Image.fromarray(edge), Size(full_width, full_height), radius)[full_height // 2])
+    if 0 == len(drawn):
+        return (1.0, 1.0)
+    values = np.asarray(Image.fromarray(_to_gaussian_blur(edge[1:2] / 255, radius / reduction)).resize(
+        (full_width, 1), Image.Resampling.BILINEAR
+    ))[0]
+    first, last = drawn[0], drawn[-1]
+    return (
+        float(values[max(0, first - 1)] + values[first]) / 2,
+        float(values[last] + values[min(full_width - 1, last + 1)]) / 2
+    )
+
+
 class LayoutContour:
     
     def __init__(
         self,
-        mask: np.ndarray | None,
+        mask: np.ndarray | Callable[[], np.ndarray] | None,
         width: float,
         color: str
     ) -> None:
+        # a callable loads the mask on first access
         self._mask = mask
         self._width = width
         self._color = color
+        # contours at (at most) mask resolution, by output size
+        self._contours: OrderedDict[tuple[int, int], tuple[np.ndarray, float, float]] = OrderedDict()
     
     @property
     def mask(self) -> np.ndarray | None:
+        if callable(self._mask):
+            self._mask = self._mask()
         return self._mask
     
     @property
@@ -169,43 +323,78 @@ class LayoutContour:
     @property
     def color(self) -> str:
         return self._color
+
+    def _to_contour(self, size: Size) -> tuple[np.ndarray, float, float]:
+        """
+        contour for an output of size, computed once at (at most) mask resolution: (values, lower, upper)
+        the contour is drawn where the values, upscaled to size, are between lower and upper
+        """
+        key = size.image_tuple
+        if key in self._contours:
+            self._contours.move_to_end(key)
+            return self._contours[key]
+
+        # use gaussian to change width, divide by 10 to give more resolution; radius in output pixels
+        radius = self.width / 10
+        mask = Image.fromarray(self.mask.astype(np.uint8))
+        if mask.mode != 'L':
+            mask = mask.convert('L')
+        if size.height <= mask.height:
+            # no larger than the mask, this is the full resolution contour
+            contour = (_to_edge_contour(mask, size, radius), 0.0, math.inf)
+        else:
+            # larger outputs upscale the mask blurred at mask resolution, drawn in the band its edge takes at full resolution
+            values = np.asarray(mask) / 255
+            reduction = size.height / mask.height
+            contour = (_to_gaussian_blur(values, radius / reduction), *_to_contour_band(reduction, radius))
+        self._contours[key] = contour
+        while CONTOUR_CACHE_SIZE < len(self._contours):
+            self._contours.popitem(last=False)
+        return contour
+
+    def to_alpha(self, size: Size, upper: int = 0, lower: int | None = None) -> np.ndarray:
+        """
+        boolean contour of rows [upper, lower) of an output of size
+        the cached contour is upscaled for just those rows, sampled where upscaling all rows would sample them
+        """
+        lower = lower if lower is not None else size.height
+        values, lower_value, upper_value = self._to_contour(size)
+        if values.shape[0] == size.height:
+            values = values[upper:lower]
+        else:
+            reduction = size.height / values.shape[0]
+            values = np.asarray(Image.fromarray(values).resize(
+                (size.width, lower - upper),
+                Image.Resampling.BILINEAR,
+                box=(0, upper / reduction, values.shape[1], lower / reduction)
+            ))
+        return (lower_value < values) & (values < upper_value)
     
     def to_image(self, image: NamedImage) -> NamedImage:
-        if self.mask == None or self.width == 0:
+        if self.mask is None or self.width == 0:
             return image
         
-        contour = Image.fromarray(self.mask.astype(np.uint8))
-        contour = contour.resize(image.image.size)
-        contour = contour.filter(ImageFilter.FIND_EDGES)
-        contour = np.array(contour)
-
-        # make sure borders are not drawn before changing width
-        contour[[0, -1], :] = 0
-        contour[:, [0, -1]] = 0
-
-        # use gaussian to change width, divide by 10 to give more resolution
-        radius = self.width / 10
-        contour = Image.fromarray(contour)
-        contour = contour.filter(ImageFilter.GaussianBlur(radius=radius))
-        contour = np.array(contour) > 0
-        contour = np.dstack((contour, contour, contour))
+        size = Size(image.image.width, image.image.height)
+        alpha = Image.fromarray(self.to_alpha(size))
+        # color the contour, in place
+        image.image.paste(self.color, (0, 0, size.width, size.height), alpha)
+        return image
 
-        # color the contour
-        ret = np.array(image.image) * np.invert(contour)
-        if self.color != 'black':
-            color = Image.new(image.image.mode, image.image.size, self.color)
-            ret += np.array(color) * contour
+    def to_strip(self, strip: np.ndarray, mode: str, canvas_size: Size, upper: int) -> np.ndarray:
+        """
+        color the contour into strip, rows [upper, upper + strip height) of the canvas, in place
+        """
+        if self.mask is None or self.width == 0:
+            return strip
 
-        return NamedImage(
-            Image.fromarray(ret),
-            image.name
-        )
+        alpha = self.to_alpha(canvas_size, upper, upper + strip.shape[0])
+        strip[alpha] = np.asarray(Image.new(mode, (1, 1), self.color))[0, 0]
+        return strip
 
-    def write(self, layout_name: str, layout_directory: str) -> Dict[str,Any]:
+    def write(self, layout_name: str, storage: LayoutDirectory | LayoutBundle) -> Dict[str,Any]:
         mask_filepath = ''
         if self.mask is not None:
-            mask_filepath = to_unused_filepath(layout_directory, '{0}.contour_mask'.format(layout_name), 'png')
-            Image.fromarray(self.mask).save(mask_filepath)
+            mask_filepath = storage.write_mask('{0}.contour_mask'.format(layout_name), self.mask)
 
         return {     
             LAYOUT_CONTOUR_MASK_IMAGE_FILEPATH: mask_filepath,
@@ -218,12 +407,12 @@ class LayoutContour:
         return { header:'' for header in LAYOUT_CONTOUR_HEADERS }
 
     @staticmethod
-    def load(row: Dict[str,Any], _row_no: int, layout_directory: str):
+    def load(row: Dict[str,Any], _row_no: int, storage: LayoutDirectory | LayoutBundle):
         if all([is_empty(row[header])  for header in LAYOUT_CONTOUR_HEADERS]): 
             return None
 
         return LayoutContour(
-            np.array(NamedImage.load(to_existing_filepath(row[LAYOUT_CONTOUR_MASK_IMAGE_FILEPATH], layout_directory)).image) if not(is_empty(row[LAYOUT_CONTOUR_MASK_IMAGE_FILEPATH])) else None,
+            storage.to_mask_loader(row[LAYOUT_CONTOUR_MASK_IMAGE_FILEPATH]) if not(is_empty(row[LAYOUT_CONTOUR_MASK_IMAGE_FILEPATH])) else None,
             float(row[LAYOUT_CONTOUR_WIDTH]),
             row[LAYOUT_CONTOUR_COLOR]
         )
@@ -281,39 +470,58 @@ class LayoutItem:
     def reservation_color(self, color: Color) -> None:
         self._reservation_color = color
 
+    def to_source_size(self, scale: float = 1.0) -> Size:
+        size = self.placement_box.size.scale(scale)
+        if self.orientation in TRANSPOSED_ORIENTATIONS:
+            return Size(size.height, size.width)
+        return size
+
+    def decode(self, scale: float = 1.0) -> Image.Image:
+        return self.original_image.decode(self.to_source_size(scale))
+
     def to_image(
         self,
         logger: BaseLogger,
-        scale: float = 1.0
+        scale: float = 1.0,
+        thumbnail_cache: ThumbnailCache | None = None,
+        resample: Image.Resampling = Image.Resampling.BICUBIC
     ) -> NamedImage:
-        new_image = self.original_image.image
+        new_size = self.placement_box.size.scale(scale)
+        source = self.original_image.source
+        if thumbnail_cache is not None and source is not None:
+            cached_image = thumbnail_cache.get(source, new_size, self.orientation, resample)
+            if cached_image is not None:
+                logger.debug('Using cached thumbnail {0} {1}', self.name, new_size.size_to_string())
+                return NamedImage(cached_image, self.original_image.name)
+
+        new_image = self.decode(scale)
 
         if self.orientation:
-            logger.info('Transposing {0} {1}'.format(self.name, self.orientation.name))
+            logger.debug('Transposing {0} {1}', self.name, self.orientation.name)
             new_image = new_image.transpose(self.orientation)
         
-        new_size = self.placement_box.size.scale(scale)
         if new_image.size != new_size.image_tuple:
-            logger.info('Resizing {0} ({1},{2}) -> {3}'.format(
+            logger.debug('Resizing {0} ({1},{2}) -> {3}',
                 self.original_image.name,
                 new_image.size[0], new_image.size[1],
                 new_size.size_to_string()
-            ))
-            new_image = new_image.resize(new_size.image_tuple)
+            )
+            new_image = new_image.resize(new_size.image_tuple, resample, reducing_gap=RESIZE_REDUCING_GAP)
+        if thumbnail_cache is not None and source is not None:
+            thumbnail_cache.put(source, new_size, self.orientation, new_image, resample)
         return NamedImage(new_image, self.original_image.name)
 
-    def to_legend_handle(self) -> mpatches.Patch:
-        return mpatches.Patch(
-            color=self.reservation_color.hex_code,
-            label=self.name
+    def to_render_step(self, scale: float = 1.0) -> RenderStep:
+        return RenderStep(
+            self.original_image.original,
+            self.orientation,
+            self.placement_box.scale(scale),
+            self.placement_box.size.scale(scale)
         )
 
-    def write(self, layout_directory: str) -> Dict[str,Any]:
-        image_filepath = to_unused_filepath(layout_directory, self.original_image.name, 'png')
-        self.original_image.image.save(image_filepath, 'png')
-        
+    def write(self, storage: LayoutDirectory | LayoutBundle, reference_sources: bool = False) -> Dict[str,Any]:
         return {
-            LAYOUT_ITEM_IMAGE_FILEPATH: image_filepath,
+            LAYOUT_ITEM_IMAGE_FILEPATH: storage.write_image(self.original_image.original, reference_sources),
             LAYOUT_ITEM_POSITION_X: self.placement_box.left,
             LAYOUT_ITEM_POSITION_Y: self.placement_box.upper,
             LAYOUT_ITEM_SIZE_WIDTH: self.placement_box.width,
@@ -324,7 +532,8 @@ class LayoutItem:
             LAYOUT_ITEM_RESERVATION_SIZE_WIDTH: self.reservation_box.width,
             LAYOUT_ITEM_RESERVATION_SIZE_HEIGHT: self.reservation_box.height,
             LAYOUT_ITEM_RESERVATION_NO: self.reservation_no,
-            LAYOUT_ITEM_LATENCY: self._latency_str
+            LAYOUT_ITEM_LATENCY: self._latency_str,
+            LAYOUT_ITEM_NAME: self.name
         }
 
     @staticmethod
@@ -332,7 +541,7 @@ class LayoutItem:
         return { header:'' for header in LAYOUT_ITEM_HEADERS }
 
     @staticmethod
-    def load(row: Dict[str,Any], row_no: int, layout_directory: str):
+    def load(row: Dict[str,Any], row_no: int, storage: LayoutDirectory | LayoutBundle):
         if all([is_empty(row[header])  for header in LAYOUT_ITEM_HEADERS]): 
             return None
 
@@ -350,6 +559,8 @@ class LayoutItem:
             LAYOUT_ITEM_RESERVATION_SIZE_HEIGHT
         ]
 
+        # asset filenames are content hashes, so the item name is kept in its own column
+        source = storage.to_image_source(row[LAYOUT_ITEM_IMAGE_FILEPATH])
         if all([header in row and not(is_empty(row[header])) for header in reservation_headers]):
             reservation_box = Box(
                 int(row[LAYOUT_ITEM_RESERVATION_POSITION_X]),
@@ -359,7 +570,10 @@ class LayoutItem:
             )
         
         return LayoutItem(
-            NamedImage.load(to_existing_filepath(row[LAYOUT_ITEM_IMAGE_FILEPATH], layout_directory)),
+            NamedImage(
+                source,
+                row[LAYOUT_ITEM_NAME] if LAYOUT_ITEM_NAME in row and not(is_empty(row[LAYOUT_ITEM_NAME])) else os.path.splitext(os.path.basename(row[LAYOUT_ITEM_IMAGE_FILEPATH]))[0]
+            ),
             placement_box,
             Image.Transpose[row[LAYOUT_ITEM_ORIENTATION]] if not(is_empty(row[LAYOUT_ITEM_ORIENTATION])) else None,
             reservation_box,
@@ -381,14 +595,14 @@ class Layout:
         margin: int | None = None,
         name: str | None = None,
         total_threads: int | None = None,
-        latency_str: str = ''
+        latency_str: str = '',
+        render_cache: RenderPlanCache | None = None,
+        sampling_counters: SamplingCounters | None = None
     ) -> None:
         self._name = name if name else 'imagecloud.layout'
         self._canvas = canvas
         self._contour = contour
         self._items = items
-        for item in items:
-            item.reservation_color = canvas.reservation_colors[item.reservation_no]
             
         self.max_images = max_images if max_images is not None else int(helper.DEFAULT_MAX_IMAGES)
         self.min_image_size = min_image_size if min_image_size is not None else int(helper.DEFAULT_MIN_IMAGE_SIZE)
@@ -397,8 +611,11 @@ class Layout:
         self.scale = scale if scale is not None else int(helper.DEFAULT_SCALE)
 
         self.margin = margin if margin is not None else int(helper.DEFAULT_MARGIN)
-        self.total_threads = total_threads if total_threads is not None else int(helper.DEFAULT_PARALLELISM)
+        self.total_threads = total_threads if total_threads is not None else int(helper.DEFAULT_TOTAL_THREADS)
         self._latency_str = latency_str
+        self._render_cache = render_cache if render_cache is not None else RenderPlanCache(int(helper.DEFAULT_RENDER_CACHE_MB) * 1024 * 1024)
+        # native sampler work placing the items, added up over all placements (none for loaded layouts)
+        self._sampling_counters = sampling_counters if sampling_counters is not None else SamplingCounters()
     
     @property
     def name(self) -> str:
@@ -420,67 +637,271 @@ class Layout:
     def items(self) -> list[LayoutItem]:
         return self._items
     
-    def reconstruct_reservation_map(self,logger: BaseLogger ) -> ReservationMapType:
+    @property
+    def render_cache(self) -> RenderPlanCache | None:
+        return self._render_cache
+
+    @render_cache.setter
+    def render_cache(self, cache: RenderPlanCache | None) -> None:
+        self._render_cache = cache
+
+    @property
+    def sampling_counters(self) -> SamplingCounters:
+        return self._sampling_counters
+
+    def materialize(self, image_threads: int = 1) -> None:
+        """
+        load the lazily loaded reservation map, contour mask and item image headers together on image_threads threads
+        """
+        loaders: list[Callable[[], Any]] = [
+            lambda: self.canvas.reservation_map,
+            lambda: self.contour.mask,
+            *[(lambda source: lambda: source.size)(item.original_image.source) for item in self.items if item.original_image.source is not None]
+        ]
+        for _ in map_images_in_threads(lambda load: load(), loaders, image_threads):
+            pass
+
+    def to_render_plan(self, scale: float = 1.0) -> list[RenderStep]:
+        return [item.to_render_step(scale) for item in self.items]
+
+    def reconstruct_reservation_map(self, logger: BaseLogger | None = None) -> ReservationMapType:
         return Reservations.create_reservation_map(
             logger,
             self.canvas.size,
-            [item.reservation_box for item in self.items]
+            [item.reservation_box for item in self.items],
+            [item.reservation_no for item in self.items]
         )
     
     def to_image(
         self,
         logger: BaseLogger,
-        scale: float = 1.0
+        scale: float = 1.0,
+        image_threads: int = 1,
+        thumbnail_cache: ThumbnailCache | None = None,
+        resample: Image.Resampling = Image.Resampling.BICUBIC,
+        compositor: str = helper.DEFAULT_COMPOSITOR,
+        metrics: Metrics | None = None
     ) -> NamedImage:
         logger.reset_context()
+        metrics = metrics if metrics is not None else Metrics(self.name, logger.tracer)
+        hits = self._render_cache.hits if self._render_cache is not None else 0
+        with metrics.phase('render'):
+            if compositor == 'NUMPY' and self.canvas.mode in NUMPY_COMPOSITE_MODES:
+                canvas = self._composite_in_array(logger, scale, image_threads, thumbnail_cache, resample, metrics)
+            else:
+                canvas = self._paste_into_canvas(logger, scale, image_threads, thumbnail_cache, resample, metrics)
+            if self._render_cache is not None:
+                logger.info('reused {0} of {1} prepared images'.format(self._render_cache.hits - hits, len(self.items)))
+            return self.contour.to_image(canvas)
+
+    def _to_item_image(
+        self,
+        index: int,
+        step: RenderStep,
+        logger: BaseLogger,
+        scale: float,
+        thumbnail_cache: ThumbnailCache | None,
+        resample: Image.Resampling,
+        metrics: Metrics
+    ) -> Image.Image:
+        def prepare() -> Image.Image:
+            image = self.items[index].to_image(logger, scale, thumbnail_cache, resample).image
+            return image if image.mode == self.canvas.mode else image.convert(self.canvas.mode)
+        start_ns = time.perf_counter_ns()
+        if self._render_cache is None:
+            image = prepare()
+        else:
+            image = self._render_cache.prepare(step, self.canvas.mode, resample, prepare)
+        end_ns = time.perf_counter_ns()
+        metrics.observe('render_ms', (end_ns - start_ns) / 1000000)
+        if metrics.tracer is not None:
+            metrics.tracer.add_span('prepare-{0}'.format(self.items[index].name), start_ns, end_ns)
+        return image
+
+    def _paste_into_canvas(
+        self,
+        logger: BaseLogger,
+        scale: float,
+        image_threads: int,
+        thumbnail_cache: ThumbnailCache | None,
+        resample: Image.Resampling,
+        metrics: Metrics
+    ) -> NamedImage:
         canvas = self.canvas.to_image(scale)
+        plan = self.to_render_plan(scale)
 
         total = len(self.items)
         logger.info('pasting {0} images into imagecloud canvas'.format(total))
-
+        # prepare item images (decode or fetch cached thumbnail, transpose, resize) on image_threads threads
+        # and paste them in layout order as each completes
+        item_images = map_images_in_threads(
+            lambda i: self._to_item_image(i, plan[i], logger, scale, thumbnail_cache, resample, metrics),
+            range(total),
+            image_threads
+        )
         for i in range(total):
             item: LayoutItem = self.items[i]
-            logger.info('pasting Image[{0}/{1}] {2} into imagecloud canvas'.format(i + 1, total, item.original_image.name))            
-            image = item.to_image(logger, scale)
-            box = item.placement_box.scale(scale)
+            image = next(item_images)
+            logger.debug('pasting Image[{0}/{1}] {2} into imagecloud canvas', i + 1, total, item.original_image.name)
             try:
                 canvas.image.paste(
-                    im=image.image,
-                    box=box.image_tuple
+                    im=image,
+                    box=plan[i].box.image_tuple
                 )
             except Exception as e:
-                logger.error('Error pasting {0} into {1}. {2} \n{3}'.format(image.name, canvas.name, str(e), '\n'.join(traceback.format_exception(e))))
+                logger.error('Error pasting {0} into {1}. {2} \n{3}'.format(item.original_image.name, canvas.name, str(e), '\n'.join(traceback.format_exception(e))))
+        return canvas
 
-        return self.contour.to_image(canvas)
+    def _composite_in_array(
+        self,
+        logger: BaseLogger,
+        scale: float,
+        image_threads: int,
+        thumbnail_cache: ThumbnailCache | None,
+        resample: Image.Resampling,
+        metrics: Metrics
+    ) -> NamedImage:
+        buffer = self.canvas.to_array(scale)
+        plan = self.to_render_plan(scale)
+        boxes = [step.box for step in plan]
+        overlapping = to_overlapping_indexes(boxes)
+
+        def composite(index: int) -> np.ndarray | str | None:
+            try:
+                tile = np.asarray(self._to_item_image(index, plan[index], logger, scale, thumbnail_cache, resample, metrics))
+                if index in overlapping:
+                    # written in layout order by the caller, so later items cover earlier ones as with paste
+                    return tile
+                # reserved boxes never overlap, so threads write disjoint regions of the buffer without locking
+                write_tile(buffer, 0, boxes[index], tile)
+                return None
+            except Exception as e:
+                return '{0} \n{1}'.format(str(e), '\n'.join(traceback.format_exception(e)))
+
+        total = len(self.items)
+        logger.info('compositing {0} images into imagecloud canvas'.format(total))
+        results = map_images_in_threads(composite, range(total), image_threads)
+        for i in range(total):
+            item: LayoutItem = self.items[i]
+            result = next(results)
+            logger.debug('composited Image[{0}/{1}] {2} into imagecloud canvas', i + 1, total, item.original_image.name)
+            if isinstance(result, str):
+                logger.error('Error compositing {0} into {1}. {2}'.format(item.original_image.name, self.canvas.name, result))
+            elif result is not None:
+                write_tile(buffer, 0, boxes[i], result)
+        return self.canvas.from_array(buffer)
 
-    def to_reservation_chart_image(self) -> NamedImage:
+    def to_strips(
+        self,
+        logger: BaseLogger,
+        tile_height: int,
+        scale: float = 1.0,
+        image_threads: int = 1,
+        thumbnail_cache: ThumbnailCache | None = None,
+        resample: Image.Resampling = Image.Resampling.BICUBIC,
+        metrics: Metrics | None = None
+    ) -> Iterator[np.ndarray]:
+        """
+        composite the canvas top to bottom, tile_height rows at a time, yielding each strip of rows in canvas mode
+        only items intersecting a strip are prepared, and released once every strip they cover has been yielded
+        """
+        logger.reset_context()
+        metrics = metrics if metrics is not None else Metrics(self.name, logger.tracer)
+        size = self.canvas.size.scale(scale)
+        plan = self.to_render_plan(scale)
+        boxes = [step.box for step in plan]
+        by_upper = sorted(range(len(self.items)), key=lambda i: boxes[i].upper)
+        next_item = 0
+        tiles: dict[int, np.ndarray] = dict()
+
+        def prepare(index: int) -> np.ndarray | None:
+            try:
+                return np.asarray(self._to_item_image(index, plan[index], logger, scale, thumbnail_cache, resample, metrics))
+            except Exception as e:
+                logger.error('Error compositing {0} into {1}. {2} \n{3}'.format(self.items[index].original_image.name, self.canvas.name, str(e), '\n'.join(traceback.format_exception(e))))
+                return None
+
+        for upper in range(0, size.height, tile_height):
+            lower = min(upper + tile_height, size.height)
+            entering: list[int] = list()
+            while next_item < len(by_upper) and boxes[by_upper[next_item]].upper < lower:
+                entering.append(by_upper[next_item])
+                next_item += 1
+            logger.debug('compositing rows [{0}, {1}) of {2}: {3} images, {4} new', upper, lower, size.height, len(tiles) + len(entering), len(entering))
+            for index, tile in zip(entering, map_images_in_threads(prepare, entering, image_threads)):
+                if tile is not None:
+                    tiles[index] = tile
+
+            buffer = self.canvas.to_array(scale, lower - upper)
+            # layout order, so overlapping items cover earlier ones as with paste
+            for index in sorted(tiles.keys()):
+                write_tile(buffer, upper, boxes[index], tiles[index])
+            for index in [index for index in tiles.keys() if boxes[index].lower <= lower]:
+                del tiles[index]
+            yield self.contour.to_strip(self.canvas.to_mode_array(buffer), self.canvas.mode, size, upper)
+
+    def write_png_strips(
+        self,
+        filepath: str,
+        logger: BaseLogger,
+        tile_height: int,
+        scale: float = 1.0,
+        image_threads: int = 1,
+        thumbnail_cache: ThumbnailCache | None = None,
+        resample: Image.Resampling = Image.Resampling.BICUBIC,
+        metrics: Metrics | None = None
+    ) -> None:
+        metrics = metrics if metrics is not None else Metrics(self.name, logger.tracer)
+        strips = self.to_strips(logger, tile_height, scale, image_threads, thumbnail_cache, resample, metrics)
+        with PNGStripWriter(filepath, self.canvas.size.scale(scale), self.canvas.mode) as writer:
+            # compositing a strip and encoding it alternate, so each is timed on its own
+            while True:
+                with metrics.phase('render'):
+                    strip = next(strips, None)
+                if strip is None:
+                    break
+                with metrics.phase('encode'):
+                    writer.write(strip)
+
+    def to_reservation_chart_image(self, backend: str = helper.DEFAULT_RESERVATION_CHART_BACKEND) -> NamedImage:
         reservation_image: NamedImage = self.canvas.to_reservation_image()
-        legend_handles: list[mpatches.Patch] = [
-            mpatches.Patch(
-                color=self.canvas.reservation_colors[0].hex_code,
-                label='UNRESERVED'
-            ),
-            *[item.to_legend_handle() for item in self.items]
+        # colors need the reservation map, so they are only assigned when charting
+        for item in self.items:
+            item.reservation_color = self.canvas.reservation_colors[item.reservation_no]
+        legend: list[tuple[str, Color]] = [
+            ('UNRESERVED', self.canvas.reservation_colors[0]),
+            *[(item.name, item.reservation_color) for item in self.items]
         ]
-        plt.imshow(reservation_image.image)
-        plt.legend(handles=legend_handles, bbox_to_anchor=(1.05, 1), loc=2, borderaxespad=0.)
-        plt.axis('off')
-        plt.grid(True)
-        plt.tight_layout()        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        image = Image.open(buf)
-        image.load()
-        result = NamedImage(
-            image,
+        return NamedImage(
+            draw_reservation_chart(reservation_image.image, legend, backend),
             reservation_image.name
         )
-        buf.close()
-        return result
 
-    def write(self, csv_filepath: str) -> None:
-        layout_directory = os.path.dirname(csv_filepath)
+    def write(
+        self,
+        filepath: str,
+        reservation_map_format: str = helper.DEFAULT_RESERVATION_MAP_FORMAT,
+        layout_images: str = helper.DEFAULT_LAYOUT_IMAGES
+    ) -> None:
+        """
+        write the layout csv (and its map, mask and images) or, given a .zip filepath, a single file layout bundle
+        """
+        if is_bundle_filepath(filepath):
+            with LayoutBundle.create(filepath) as bundle:
+                file = io.StringIO()
+                self._write_csv(file, bundle, reservation_map_format, layout_images)
+                bundle.write(BUNDLE_LAYOUT_MEMBER, file.getvalue().encode('utf-8'), True)
+        else:
+            with open(filepath, 'w') as file:
+                self._write_csv(file, LayoutDirectory(os.path.dirname(filepath)), reservation_map_format, layout_images)
+
+    def _write_csv(
+        self,
+        file: io.TextIOBase,
+        storage: LayoutDirectory | LayoutBundle,
+        reservation_map_format: str,
+        layout_images: str
+    ) -> None:
         layout_data = {
             LAYOUT_MAX_IMAGES: self.max_images,
             LAYOUT_MIN_IMAGE_SIZE_WIDTH: self.min_image_size.width,
@@ -493,27 +914,34 @@ class Layout:
             LAYOUT_TOTAL_THREADS: self.total_threads,
             LAYOUT_LATENCY: self._latency_str
         }
-        with open(csv_filepath, 'w') as file:
-            csv_writer = csv.DictWriter(file, fieldnames=LAYOUT_CSV_HEADERS)
-            csv_writer.writeheader()
-            for i in range(len(self.items)):
-                csv_writer.writerow({
-                    **(layout_data if i == 0 else { header:'' for header in LAYOUT_HEADERS }),
-                    **(self.canvas.write(layout_directory) if i == 0 else LayoutCanvas.empty_csv_data()),
-                    **(self.contour.write(self.name, layout_directory) if i == 0 else LayoutContour.empty_csv_data()),
-                    **(self.items[i].write(layout_directory))
-                })
+        csv_writer = csv.DictWriter(file, fieldnames=LAYOUT_CSV_HEADERS)
+        csv_writer.writeheader()
+        for i in range(len(self.items)):
+            csv_writer.writerow({
+                **(layout_data if i == 0 else { header:'' for header in LAYOUT_HEADERS }),
+                **(self.canvas.write(storage, reservation_map_format) if i == 0 else LayoutCanvas.empty_csv_data()),
+                **(self.contour.write(self.name, storage) if i == 0 else LayoutContour.empty_csv_data()),
+                **(self.items[i].write(storage, layout_images == 'reference'))
+            })
                 
         
     @staticmethod
-    def load(csv_filepath: str):
+    def load(filepath: str, image_threads: int = 1):
+        """
+        load a layout csv or, given a .zip filepath, a layout bundle; its table is read in one pass, from a single read of the bundle member
+        """
         try:
             canvas: LayoutCanvas | None = None
-            items: list[LayoutItem] = list()
+            item_rows: list[tuple[Dict[str,Any], int]] = list()
             contour: LayoutContour | None = None
-            layout_directory: str = os.path.dirname(csv_filepath)
+            storage: LayoutDirectory | LayoutBundle = LayoutDirectory(os.path.dirname(filepath))
+            if is_bundle_filepath(filepath):
+                storage = LayoutBundle(filepath)
+                file = io.StringIO(storage.read(BUNDLE_LAYOUT_MEMBER).decode('utf-8'), newline='')
+            else:
+                file = open(filepath, 'r')
             layout_data = {}
-            with open(csv_filepath, 'r') as file:    
+            with file:
                 csv_reader = csv.DictReader(file, fieldnames=LAYOUT_CSV_HEADERS)
                 next(csv_reader)
                 row_no = 0
@@ -526,11 +954,16 @@ class Layout:
                                 layout_data[header] = row[header]
 
                     if canvas == None:
-                        canvas = LayoutCanvas.load(row, row_no, layout_directory)
+                        canvas = LayoutCanvas.load(row, row_no, storage)
                     if contour == None:
-                        contour = LayoutContour.load(row, row_no, layout_directory)
-                    items.append(LayoutItem.load(row, row_no, layout_directory))
-            
+                        contour = LayoutContour.load(row, row_no, storage)
+                    item_rows.append((row, row_no))
+
+            items: list[LayoutItem] = list(map_images_in_threads(
+                lambda item_row: LayoutItem.load(item_row[0], item_row[1], storage),
+                item_rows,
+                image_threads
+            ))
             if canvas == None or contour == None or 0 == len(items):
                 return None
             
@@ -543,7 +976,7 @@ class Layout:
             name = layout_data[LAYOUT_NAME] if LAYOUT_NAME in layout_data else None  
             total_threads = int(layout_data[LAYOUT_TOTAL_THREADS]) if LAYOUT_TOTAL_THREADS in layout_data else None
             latency_str = layout_data[LAYOUT_LATENCY] if LAYOUT_LATENCY in layout_data else ''
-            return Layout(
+            layout = Layout(
                 canvas,
                 contour,
                 items,
@@ -557,6 +990,9 @@ class Layout:
                 total_threads,
                 latency_str
             )
+            if not(canvas.has_reservation_map):
+                canvas.reservation_map = layout.reconstruct_reservation_map
+            return layout
         except Exception as e:
             raise Exception(str(e))
 
@@ -615,7 +1051,7 @@ LAYOUT_CANVAS_BACKGROUND_COLOR_HELP = '<empty>|<any-color-name>'
 LAYOUT_CANVAS_NAME = 'layout_canvas_name'
 LAYOUT_CANVAS_NAME_HELP = '<name>'
 LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH = 'layout_canvas_reservation_map_csv_filepath'
-LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH_HELP = '<csv-filepath-of-reservation_map>'
+LAYOUT_CANVAS_RESERVATION_MAP_FILEPATH_HELP = '<empty>|<npy|npz|csv-filepath-of-reservation_map>'
 LAYOUT_CANVAS_HEADERS = [
     LAYOUT_CANVAS_NAME,
     LAYOUT_CANVAS_MODE,
@@ -674,6 +1110,8 @@ LAYOUT_ITEM_RESERVATION_NO = 'layout_item_reservation_no'
 LAYOUT_ITEM_RESERVATION_NO_HELP = '<empty>|<reservation_no_in_reservation_map>'
 LAYOUT_ITEM_LATENCY = 'layout_item_latency'
 LAYOUT_ITEM_LATENCY_HELP = '<string>' 
+LAYOUT_ITEM_NAME = 'layout_item_name'
+LAYOUT_ITEM_NAME_HELP = '<empty>|<name>'
 LAYOUT_ITEM_HEADERS = [
     LAYOUT_ITEM_IMAGE_FILEPATH,
     LAYOUT_ITEM_POSITION_X,
@@ -686,7 +1124,8 @@ LAYOUT_ITEM_HEADERS = [
     LAYOUT_ITEM_RESERVATION_SIZE_WIDTH,
     LAYOUT_ITEM_RESERVATION_SIZE_HEIGHT,
     LAYOUT_ITEM_RESERVATION_NO,
-    LAYOUT_ITEM_LATENCY
+    LAYOUT_ITEM_LATENCY,
+    LAYOUT_ITEM_NAME
 ]
 LAYOUT_ITEM_HEADER_HELP = [
     LAYOUT_ITEM_IMAGE_FILEPATH_HELP,
@@ -700,7 +1139,8 @@ LAYOUT_ITEM_HEADER_HELP = [
     LAYOUT_ITEM_RESERVATION_SIZE_WIDTH_HELP,
     LAYOUT_ITEM_RESERVATION_SIZE_HEIGHT_HELP,
     LAYOUT_ITEM_RESERVATION_NO_HELP,
-    LAYOUT_ITEM_LATENCY_HELP
+    LAYOUT_ITEM_LATENCY_HELP,
+    LAYOUT_ITEM_NAME_HELP
 ]
 
 LAYOUT_CSV_HEADERS = [
@@ -719,7 +1159,9 @@ LAYOUT_CSV_HEADER_HELP = [
 LAYOUT_CSV_FILE_HELP = '''csv file representing 1 Layout Contour, 1 Layout Canvas and N Layout Items:
 "{0}"
 {1}
+or a .zip layout bundle holding that csv as {2} with its files as members
 '''.format(
     '","'.join(LAYOUT_CSV_HEADERS),
-    ','.join(LAYOUT_CSV_HEADER_HELP)
+    ','.join(LAYOUT_CSV_HEADER_HELP),
+    BUNDLE_LAYOUT_MEMBER
 )
\ No newline at end of file
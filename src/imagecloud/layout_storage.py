@@ -0,0 +1,180 @@
+import io
+import os
+import zipfile
+import numpy as np
+from PIL import Image
+from typing import BinaryIO, Callable
+from imagecloud.image_wrappers import ImageSource
+from imagecloud.asset_store import (AssetStore, ASSET_DIRECTORY_NAME)
+from imagecloud.parsers import to_unused_filepath
+from imagecloud.reservations import (
+    ReservationMapType,
+    ReservationMapDataType
+)
+
+BUNDLE_SUFFIX = 'zip'
+# the layout table (same headers as the layout csv) with member names in place of filepaths
+BUNDLE_LAYOUT_MEMBER = 'layout.csv'
+BUNDLE_ASSET_DIRECTORY = 'assets'
+
+
+def is_bundle_filepath(filepath: str) -> bool:
+    return os.path.splitext(filepath)[1].lower() == '.{0}'.format(BUNDLE_SUFFIX)
+
+def to_existing_filepath(original_filepath: str, possible_dirnames: list[str] | str) -> str:
+    basename = os.path.basename(original_filepath)
+    if isinstance(possible_dirnames, str):
+        possible_dirnames = [possible_dirnames]
+    possible_dirnames = [os.path.dirname(original_filepath), *possible_dirnames]
+    tried_filepaths: list[str] = list()
+    for dirname in possible_dirnames:
+        filepath = os.path.join(dirname, basename)
+        if os.path.exists(filepath):
+            return filepath
+        tried_filepaths.append(filepath)
+
+    raise ValueError('The file {0} does not exist! (Tried [{1}])'.format(original_filepath, ', '.join(tried_filepaths)))
+
+def write_reservation_map(file: str | BinaryIO, reservation_map: ReservationMapType, suffix: str | None = None) -> None:
+    # format by suffix: npy (binary), npz (compressed binary) or csv (text)
+    suffix = suffix if suffix is not None else os.path.splitext(file)[1]
+    if suffix == '.npy':
+        np.save(file, reservation_map)
+    elif suffix == '.npz':
+        np.savez_compressed(file, reservation_map=reservation_map)
+    else:
+        np.savetxt(
+            fname=file,
+            X=reservation_map,
+            fmt='%d',
+            delimiter=','
+        )
+
+def load_reservation_map(file: str | BinaryIO, suffix: str | None = None) -> ReservationMapType:
+    # npy map files are memory-mapped read-only, Reservations copies them before reserving into them
+    suffix = suffix if suffix is not None else os.path.splitext(file)[1]
+    if suffix == '.npy':
+        return np.load(file, mmap_mode='r' if isinstance(file, str) else None)
+    if suffix == '.npz':
+        with np.load(file) as reservation_map_archive:
+            return reservation_map_archive['reservation_map']
+    return np.loadtxt(
+        fname=file,
+        dtype=ReservationMapDataType,
+        delimiter=','
+    )
+
+
+class LayoutDirectory:
+    """
+    files of a layout csv: reservation map and contour mask next to it, images in its asset directory (or referenced in place)
+    filepaths are resolved relative to the directory when a layout was moved
+    """
+    def __init__(self, layout_directory: str) -> None:
+        self._layout_directory = layout_directory
+        self._asset_store = AssetStore(os.path.join(layout_directory, ASSET_DIRECTORY_NAME))
+
+    @property
+    def layout_directory(self) -> str:
+        return self._layout_directory
+
+    def write_reservation_map(self, name: str, reservation_map: ReservationMapType, reservation_map_format: str) -> str:
+        filepath = to_unused_filepath(self._layout_directory, name, reservation_map_format)
+        write_reservation_map(filepath, reservation_map)
+        return filepath
+
+    def write_mask(self, name: str, mask: np.ndarray) -> str:
+        filepath = to_unused_filepath(self._layout_directory, name, 'png')
+        Image.fromarray(mask).save(filepath)
+        return filepath
+
+    def write_image(self, image: ImageSource | Image.Image, reference_source: bool = False) -> str:
+        if reference_source and isinstance(image, ImageSource) and image.member is None:
+            return os.path.abspath(image.filepath)
+        return self._asset_store.store(image)
+
+    def to_reservation_map_loader(self, filepath: str) -> Callable[[], ReservationMapType]:
+        existing_filepath = to_existing_filepath(filepath, self._layout_directory)
+        return lambda: load_reservation_map(existing_filepath)
+
+    def to_mask_loader(self, filepath: str) -> Callable[[], np.ndarray]:
+        existing_filepath = to_existing_filepath(filepath, self._layout_directory)
+        return lambda: np.array(ImageSource(existing_filepath).decode())
+
+    def to_image_source(self, filepath: str) -> ImageSource:
+        return ImageSource(to_existing_filepath(
+            filepath,
+            [self._layout_directory, os.path.join(self._layout_directory, ASSET_DIRECTORY_NAME)]
+        ))
+
+
+class LayoutBundle:
+    """
+    single (zip) file layout: layout table, reservation map, contour mask and each distinct image stored once
+    images and npy maps are stored uncompressed, so they are read (and images decoded) straight from the bundle
+    """
+    def __init__(self, bundle_filepath: str, bundle: zipfile.ZipFile | None = None) -> None:
+        self._bundle_filepath = bundle_filepath
+        self._bundle = bundle
+        self._asset_store = AssetStore(BUNDLE_ASSET_DIRECTORY)
+        self._members: set[str] = set()
+
+    @property
+    def bundle_filepath(self) -> str:
+        return self._bundle_filepath
+
+    @staticmethod
+    def create(bundle_filepath: str) -> 'LayoutBundle':
+        return LayoutBundle(bundle_filepath, zipfile.ZipFile(bundle_filepath, 'w'))
+
+    def close(self) -> None:
+        if self._bundle is not None:
+            self._bundle.close()
+            self._bundle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        self.close()
+
+    def write(self, member: str, data: bytes, compress: bool = False) -> str:
+        if member not in self._members:
+            self._bundle.writestr(member, data, zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+            self._members.add(member)
+        return member
+
+    def write_reservation_map(self, name: str, reservation_map: ReservationMapType, reservation_map_format: str) -> str:
+        data = io.BytesIO()
+        write_reservation_map(data, reservation_map, '.{0}'.format(reservation_map_format))
+        # npz is compressed already, csv text compresses well
+        return self.write('{0}.{1}'.format(name, reservation_map_format), data.getvalue(), reservation_map_format == 'csv')
+
+    def write_mask(self, name: str, mask: np.ndarray) -> str:
+        data = io.BytesIO()
+        Image.fromarray(mask).save(data, 'png')
+        return self.write('{0}.png'.format(name), data.getvalue())
+
+    def write_image(self, image: ImageSource | Image.Image, _reference_source: bool = False) -> str:
+        # a bundle is self contained, so images are always stored in it
+        name, content = self._asset_store.to_asset(image)
+        member = '{0}/{1}'.format(BUNDLE_ASSET_DIRECTORY, name)
+        if member in self._members:
+            return member
+        if not isinstance(content, bytes):
+            with open(content, 'rb') as file:
+                content = file.read()
+        return self.write(member, content)
+
+    def read(self, member: str) -> bytes:
+        with zipfile.ZipFile(self._bundle_filepath) as bundle:
+            return bundle.read(member)
+
+    def to_reservation_map_loader(self, member: str) -> Callable[[], ReservationMapType]:
+        return lambda: load_reservation_map(io.BytesIO(self.read(member)), os.path.splitext(member)[1])
+
+    def to_mask_loader(self, member: str) -> Callable[[], np.ndarray]:
+        return lambda: np.array(ImageSource(self._bundle_filepath, member=member).decode())
+
+    def to_image_source(self, member: str) -> ImageSource:
+        return ImageSource(self._bundle_filepath, member=member)
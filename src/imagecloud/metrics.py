@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator
+if TYPE_CHECKING:
+    from imagecloud.tracer import Tracer
+
+# phases are timed where they run, so they can nest (sizing includes the trial placements it scans and reserves);
+# a phase's self time leaves out the phases nested in it on the same thread, so self times add up without double counting
+PHASES = ['load', 'sizing', 'scan', 'reserve', 'maximize', 'render', 'encode', 'write']
+COUNTERS = ['scans', 'samplings', 'rotations', 'drops']
+# counters of trial placements (sizing the images) are kept apart, so the counters above are the real placement's
+TRIAL_COUNTER_PREFIX = 'trial_'
+HISTOGRAM_PERCENTILES = [50, 90, 99]
+
+
+class PhaseMetrics:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.self_wall_seconds = 0.0
+        self.self_cpu_seconds = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'wall_seconds': round(self.wall_seconds, 6),
+            # process cpu time, all threads (native scans and image threads) included
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'self_wall_seconds': round(self.self_wall_seconds, 6),
+            'self_cpu_seconds': round(self.self_cpu_seconds, 6)
+        }
+
+
+def to_histogram(values: list[float]) -> dict[str, Any]:
+    """
+    summary (count, total, min, max, mean, percentiles) and power of 2 buckets (upper bound: count) of values
+    """
+    ordered = sorted(values)
+    count = len(ordered)
+    buckets: dict[str, int] = dict()
+    for value in ordered:
+        upper_bound = 1.0
+        while upper_bound < value:
+            upper_bound *= 2
+        key = '<={0:g}'.format(upper_bound)
+        buckets[key] = buckets.get(key, 0) + 1
+    return {
+        'count': count,
+        'total': round(sum(ordered), 6),
+        'min': round(ordered[0], 6) if 0 < count else None,
+        'max': round(ordered[-1], 6) if 0 < count else None,
+        'mean': round(sum(ordered) / count, 6) if 0 < count else None,
+        **{
+            'p{0}'.format(percentile): round(ordered[min(count - 1, (percentile * count) // 100)], 6) if 0 < count else None
+            for percentile in HISTOGRAM_PERCENTILES
+        },
+        'buckets': buckets
+    }
+
+
+class Metrics:
+    """
+    per run collector of wall and cpu time per phase, counters and per image histograms
+    safe to record into from image threads; written as one json report
+    with a tracer, each phase is also traced as a span
+    """
+    def __init__(self, name: str = '', tracer: 'Tracer | None' = None) -> None:
+        self._name = name
+        self._tracer = tracer
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._created = time.time()
+        self._start = time.perf_counter()
+        self._phases: dict[str, PhaseMetrics] = dict()
+        self._counters: dict[str, int] = {counter: 0 for counter in COUNTERS}
+        self._histograms: dict[str, list[float]] = dict()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def tracer(self) -> 'Tracer | None':
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer: 'Tracer | None') -> None:
+        self._tracer = tracer
+
+    def _open_phases(self) -> list[list[float]]:
+        open_phases = getattr(self._local, 'open_phases', None)
+        if open_phases is None:
+            open_phases = list()
+            self._local.open_phases = open_phases
+        return open_phases
+
+    @contextmanager
+    def phase(self, name: str, span_name: str | None = None) -> Iterator[None]:
+        """
+        time name, traced as span_name (default name)
+        time spent in phases nested in it is left out of its self time, and added to the phase it is nested in
+        """
+        open_phases = self._open_phases()
+        # wall and cpu seconds of the phases nested in this one
+        nested = [0.0, 0.0]
+        open_phases.append(nested)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if self._tracer is not None:
+            self._tracer.begin(span_name if span_name is not None else name)
+        try:
+            yield
+        finally:
+            if self._tracer is not None:
+                self._tracer.end()
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.process_time() - cpu_start
+            open_phases.pop()
+            if 0 < len(open_phases):
+                open_phases[-1][0] += wall_seconds
+                open_phases[-1][1] += cpu_seconds
+            self.add_phase(name, wall_seconds, cpu_seconds, wall_seconds - nested[0], cpu_seconds - nested[1])
+
+    def add_phase(
+        self,
+        name: str,
+        wall_seconds: float,
+        cpu_seconds: float,
+        self_wall_seconds: float | None = None,
+        self_cpu_seconds: float | None = None
+    ) -> None:
+        with self._lock:
+            phase = self._phases.get(name)
+            if phase is None:
+                phase = PhaseMetrics()
+                self._phases[name] = phase
+            phase.calls += 1
+            phase.wall_seconds += wall_seconds
+            phase.cpu_seconds += cpu_seconds
+            phase.self_wall_seconds += self_wall_seconds if self_wall_seconds is not None else wall_seconds
+            phase.self_cpu_seconds += self_cpu_seconds if self_cpu_seconds is not None else cpu_seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self._histograms.setdefault(name, list()).append(value)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self._name,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._created)),
+                'wall_seconds': round(time.perf_counter() - self._start, 6),
+                'phases': {
+                    name: self._phases[name].to_dict()
+                    for name in [*PHASES, *sorted(set(self._phases.keys()) - set(PHASES))]
+                    if name in self._phases
+                },
+                'counters': dict(self._counters),
+                'histograms': {name: to_histogram(values) for name, values in sorted(self._histograms.items())}
+            }
+
+    def write(self, filepath: str) -> None:
+        with open(filepath, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+            file.write('\n')
@@ -12,10 +12,12 @@ cdef enum LoggerLevel:
 cdef struct BaseLogger:
     LoggerLevel level
 
+cdef bint log_enabled(LoggerLevel level) noexcept nogil
 cdef void set_logger(int level, object callback) noexcept nogil
 cdef void log_error(const char* format, ...) noexcept nogil
 cdef void log_warning(const char* format, ...) noexcept nogil
 cdef void log_info(const char* format, ...) noexcept nogil
 cdef void log_debug(const char* format, ...) noexcept nogil
 
-cdef void log_py(LoggerLevel level, str msg)
\ No newline at end of file
+cdef void log_py(LoggerLevel level, str msg)
+cdef int drain_log()
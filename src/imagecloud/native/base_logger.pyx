@@ -10,13 +10,41 @@ cdef extern from "stdarg.h":
     void va_start(va_list ap, ...) noexcept nogil
     void va_end(va_list ap) noexcept nogil
     int vsnprintf(char *str, unsigned int size, const char *format, va_list ap) noexcept nogil
+from libcpp.atomic cimport atomic, memory_order_acquire, memory_order_release
+from libc.string cimport memcpy
+
+# native log records are written into a fixed ring buffer without taking the GIL,
+# and are handed to the python callback when python drains it (between native calls)
+cdef enum:
+    LOG_RING_CAPACITY = 1024
+    LOG_MESSAGE_LENGTH = 512
+
 cdef BaseLogger g_logger
 cdef object g_py_log
-cdef char* format_var_args(LoggerLevel level, const char* format_str, va_list args) noexcept nogil:
-    cdef char fbuf[512]
-    cdef int size = vsnprintf(NULL, 0, format_str, args) + 1
-    vsnprintf(fbuf, size, format_str, args)
-    return fbuf
+cdef LoggerLevel g_ring_levels[LOG_RING_CAPACITY]
+cdef char g_ring_messages[LOG_RING_CAPACITY][LOG_MESSAGE_LENGTH]
+cdef atomic[int] g_ring_ready[LOG_RING_CAPACITY]
+# head: next record claimed by a writer, tail: next record read by the (single, GIL holding) reader
+cdef atomic[unsigned long] g_ring_head
+cdef atomic[unsigned long] g_ring_tail
+cdef atomic[unsigned long] g_ring_dropped
+
+cdef void write_record(LoggerLevel level, const char* format_str, va_list args) noexcept nogil:
+    global g_ring_head
+    global g_ring_tail
+    global g_ring_dropped
+    cdef unsigned long head = g_ring_head.load(memory_order_acquire)
+    cdef unsigned long slot
+    while True:
+        if LOG_RING_CAPACITY <= head - g_ring_tail.load(memory_order_acquire):
+            g_ring_dropped.fetch_add(1)
+            return
+        if g_ring_head.compare_exchange_weak(head, head + 1):
+            break
+    slot = head % LOG_RING_CAPACITY
+    g_ring_levels[slot] = level
+    vsnprintf(g_ring_messages[slot], LOG_MESSAGE_LENGTH, format_str, args)
+    g_ring_ready[slot].store(1, memory_order_release)
 
 cdef void log_py(LoggerLevel level, str msg):
     global g_py_log
@@ -25,10 +53,35 @@ cdef void log_py(LoggerLevel level, str msg):
     else:
         g_py_log(level, msg)
 
+cdef int drain_log():
+    global g_ring_tail
+    global g_ring_dropped
+    cdef unsigned long tail = g_ring_tail.load(memory_order_acquire)
+    cdef unsigned long slot
+    cdef unsigned long dropped
+    cdef LoggerLevel level
+    cdef char message[LOG_MESSAGE_LENGTH]
+    cdef int drained = 0
+    while tail != g_ring_head.load(memory_order_acquire):
+        slot = tail % LOG_RING_CAPACITY
+        # claimed but still being written, the rest is drained next time
+        if 0 == g_ring_ready[slot].load(memory_order_acquire):
+            break
+        level = g_ring_levels[slot]
+        memcpy(message, g_ring_messages[slot], LOG_MESSAGE_LENGTH)
+        g_ring_ready[slot].store(0, memory_order_release)
+        tail = tail + 1
+        g_ring_tail.store(tail, memory_order_release)
+        log_py(level, message.decode('utf-8', 'replace'))
+        drained = drained + 1
+    dropped = g_ring_dropped.exchange(0)
+    if 0 < dropped:
+        log_py(LoggerLevel.WARNING, 'native log buffer full, dropped {0} records'.format(dropped))
+    return drained
 
-cdef py_callback_log(LoggerLevel level, char* message):
-    cdef str msg = message.decode('utf-8','replace')
-    log_py(level, msg)
+cdef bint log_enabled(LoggerLevel level) noexcept nogil:
+    global g_logger
+    return g_logger.level != LoggerLevel.NOT_SET and g_logger.level <= level
 
 cdef void set_logger(int level, object callback) noexcept nogil:
     global g_logger
@@ -44,63 +97,47 @@ cdef void set_logger(int level, object callback) noexcept nogil:
     else:
         g_logger.level = LoggerLevel.NOT_SET
     with gil:
+        # records logged under the previous callback go to it
+        drain_log()
         g_py_log = callback
 
 cdef void log_error(const char* format, ...) noexcept nogil:
-    global g_logger
     cdef va_list args
-    cdef char* result
-    if LoggerLevel.ERROR < g_logger.level:
+    if not log_enabled(LoggerLevel.ERROR):
         return
     va_start(args, format)
-    result = format_var_args(LoggerLevel.ERROR, format, args)
+    write_record(LoggerLevel.ERROR, format, args)
     va_end(args)
-    if result != NULL:
-        with gil:
-            py_callback_log(LoggerLevel.ERROR, result)
-
 
 cdef void log_warning(const char* format, ...) noexcept nogil:
-    global g_logger
     cdef va_list args
-    cdef char* result
-    if LoggerLevel.WARNING < g_logger.level:
+    if not log_enabled(LoggerLevel.WARNING):
         return
     va_start(args, format)
-    result = format_var_args(LoggerLevel.WARNING, format, args)
+    write_record(LoggerLevel.WARNING, format, args)
     va_end(args)
-    if result != NULL:
-        with gil:
-            py_callback_log(LoggerLevel.WARNING, result)
 
 cdef void log_info(const char* format, ...) noexcept nogil:
-    global g_logger
     cdef va_list args
-    cdef char* result
-    if LoggerLevel.INFO < g_logger.level:
+    if not log_enabled(LoggerLevel.INFO):
         return
     va_start(args, format)
-    result = format_var_args(LoggerLevel.INFO, format, args)
+    write_record(LoggerLevel.INFO, format, args)
     va_end(args)
-    if result != NULL:
-        with gil:
-            py_callback_log(LoggerLevel.INFO, result)
 
 cdef void log_debug(const char* format, ...) noexcept nogil:
-    global g_logger
     cdef va_list args
-    cdef char* result
-    if LoggerLevel.DEBUG < g_logger.level:
+    if not log_enabled(LoggerLevel.DEBUG):
         return
     va_start(args, format)
-    result = format_var_args(LoggerLevel.DEBUG, format, args)
+    write_record(LoggerLevel.DEBUG, format, args)
     va_end(args)
-    if result != NULL:
-        with gil:
-            py_callback_log(LoggerLevel.DEBUG, result)
 
 def native_set_base_logger(
     level: int, 
     callback: Callable[[int, str], None] | None = None
 ): # return nothing
-    set_logger(level, callback)
\ No newline at end of file
+    set_logger(level, callback)
+
+def native_drain_base_logger(): # return number of records logged
+    return drain_log()
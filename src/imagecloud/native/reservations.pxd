@@ -11,6 +11,14 @@ ctypedef struct Reservations:
     int buffer_length
 
 
+cdef struct SamplingCounters:
+    long long positions_examined
+    long long cells_read
+    long long candidates_found
+    int rotations_tried
+    int shrink_steps
+    long long scan_ns
+
 cdef struct SampledUnreservedOpening:
     int found
     int sampling_total
@@ -18,6 +26,7 @@ cdef struct SampledUnreservedOpening:
     Box opening_box
     Box actual_box
     Transpose orientation
+    SamplingCounters counters
 
 cdef Reservations create_reservations(
     int num_threads,
@@ -36,10 +36,16 @@ from imagecloud.native.box cimport (
 )
 from imagecloud.native.base_logger cimport (
     LoggerLevel,
+    log_enabled,
     log_debug,
     log_error,
     log_py
 )
+from imagecloud.native.trace cimport (
+    trace_enabled,
+    trace_now_ns,
+    trace_span
+)
 #NOTE: PIL Image shape is of form (width, height) https://pillow.readthedocs.io/en/stable/reference/Image.html
 
 # NOTE: ND Array shape is of form: (height, width) https://numpy.org/doc/2.2/reference/generated/numpy.ndarray.shape.html
@@ -95,12 +101,28 @@ cdef int _is_unreserved(
                 return 0
     return 1
 
+cdef long long _read_unreserved(
+    Reservations self,
+    unsigned int[:,:] self_reservation_map,
+    Box party_size
+) noexcept nogil:
+    # _is_unreserved counting the cells read: the count when unreserved, negated when a reserved cell was found
+    cdef long long width = party_size.right - party_size.left
+    cdef int row
+    cdef int col
+    for row in range(party_size.upper, party_size.lower):
+        for col in range(party_size.left, party_size.right):
+            if 0 != self_reservation_map[row, col]:
+                return -((row - party_size.upper) * width + (col - party_size.left) + 1)
+    return (party_size.lower - party_size.upper) * width
+
 cdef Box _find_unreserved_opening(
     Reservations self, 
     unsigned int[:,:] self_reservation_map,
     unsigned int[:] self_position_buffer,
     Size size,
-    random_object
+    random_object,
+    SamplingCounters* counters
 ) noexcept nogil:
     global MARK
     global EMPY
@@ -112,6 +134,11 @@ cdef Box _find_unreserved_opening(
     cdef int row
     cdef int col
     cdef int rand_pos
+    cdef long long cells
+    cdef long long cells_read = 0
+    cdef long long positions_examined = 0
+    cdef long long scan_start_ns = trace_now_ns()
+    cdef long long scan_end_ns
     pos_count.store(0)
     with nogil, parallel(num_threads=self.num_threads):
         for p in prange(total_positions):
@@ -122,13 +149,23 @@ cdef Box _find_unreserved_opening(
                 break
             if self.map_box.right < possible_opening.right:
                 continue
-            if 0 != _is_unreserved(
+            positions_examined += 1
+            cells = _read_unreserved(
                 self,
                 self_reservation_map,
                 possible_opening
-            ):
+            )
+            if 0 <= cells:
                 self_position_buffer[pos_count.fetch_add(1)] = p
+            cells_read += cells if 0 <= cells else -cells
 
+    scan_end_ns = trace_now_ns()
+    counters.positions_examined += positions_examined
+    counters.cells_read += cells_read
+    counters.candidates_found += pos_count.load()
+    counters.scan_ns += scan_end_ns - scan_start_ns
+    if trace_enabled():
+        trace_span('scan', scan_start_ns, scan_end_ns, size.width, size.height, pos_count.load())
     if 0 == pos_count.load():
         return empty_box()
 
@@ -142,10 +179,12 @@ cdef Box _find_unreserved_opening(
     possible_opening.upper = row
     possible_opening.right = possible_opening.left + size.width
     possible_opening.lower = possible_opening.upper + size.height
-    log_debug('found opening position[%d/%d](%d) [x(%d) y(%d)] Size(%d,%d) right(%d), lower(%d) isunreserved?(%d)', 
-        rand_pos, pos_count.load(), p, possible_opening.left, possible_opening.upper, size.width, size.height, possible_opening.right, possible_opening.lower,
-        _is_unreserved(self, self_reservation_map, possible_opening)
-    )
+    # re-checking the opening is only done for the debug record
+    if log_enabled(LoggerLevel.DEBUG):
+        log_debug('found opening position[%d/%d](%d) [x(%d) y(%d)] Size(%d,%d) right(%d), lower(%d) isunreserved?(%d)', 
+            rand_pos, pos_count.load(), p, possible_opening.left, possible_opening.upper, size.width, size.height, possible_opening.right, possible_opening.lower,
+            _is_unreserved(self, self_reservation_map, possible_opening)
+        )
     return possible_opening
 
 cdef SampledUnreservedOpening sample_to_find_unreserved_opening(
@@ -167,6 +206,13 @@ cdef SampledUnreservedOpening sample_to_find_unreserved_opening(
     cdef Box unreserved_opening
     cdef int sampling_count = 0
     cdef int rotate = 1
+    cdef SamplingCounters counters
+    counters.positions_examined = 0
+    counters.cells_read = 0
+    counters.candidates_found = 0
+    counters.rotations_tried = 0
+    counters.shrink_steps = 0
+    counters.scan_ns = 0
 
     while True:
         sampling_count = sampling_count + 1
@@ -175,7 +221,8 @@ cdef SampledUnreservedOpening sample_to_find_unreserved_opening(
             self_reservation_map,
             self_position_buffer,
             adjust(new_size, margin, ResizeType.NO_RESIZE_TYPE),
-            random_object
+            random_object,
+            &counters
         )
 
         if 0 == is_empty(unreserved_opening):
@@ -185,6 +232,7 @@ cdef SampledUnreservedOpening sample_to_find_unreserved_opening(
             result.opening_box = unreserved_opening
             result.actual_box = remove_margin(unreserved_opening, margin)
             result.orientation = orientation
+            result.counters = counters
             log_debug("FOUND: sample_to_find_unreserved_opening sampling[%d] size(%d, %d) orientation(%d) opening(%d,%d,%d,%d) actual(%d,%d,%d,%d)\n", 
                 result.sampling_total, result.new_size.width, result.new_size.height, result.orientation,
                 result.opening_box.left, result.opening_box.upper, result.opening_box.right, result.opening_box.lower,
@@ -195,15 +243,18 @@ cdef SampledUnreservedOpening sample_to_find_unreserved_opening(
         if 1 == rotate:
             orientation = Transpose.ROTATE_90
             new_size = transpose(new_size, orientation)
+            counters.rotations_tried += 1
             rotate = 0
         else:
             new_size = untranspose(new_size, orientation)
             new_size = adjust(new_size, shrink_step_size, resize_type)
             orientation = Transpose.NO_TRANSPOSE
+            counters.shrink_steps += 1
             if 0 != size_less_than(new_size, min_party_size):
                 result.found = 0
                 result.sampling_total = sampling_count
                 result.new_size = new_size
+                result.counters = counters
                 log_debug("NOT FOUND - TOO SMALL: sample_to_find_unreserved_opening sampling[%d] Size(%d, %d)\n", 
                     result.sampling_total, result.new_size.width, result.new_size.height
                 )
@@ -37,7 +37,7 @@ cdef Size transpose(Size self, Transpose transpose) noexcept nogil
 
 cdef Size untranspose(Size self, Transpose transpose) noexcept nogil
 
-cdef Size sampled_resize_closest_to_area(Size self, int area, int step_size, ResizeType resize_type) noexcept nogil
+cdef Size resize_closest_to_area(Size self, int area, int step_size, ResizeType resize_type, int min_length) noexcept nogil
 
 
 cdef struct WeightedSize:
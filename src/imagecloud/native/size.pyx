@@ -1,32 +1,14 @@
 # cython: language_level=3
 # cython: boundscheck=False
 # cython: wraparound=False
-from libc.math cimport round, abs, fmod, fmin, fmax
+from libc.math cimport round, abs, sqrt, floor, ceil, fmax
 cimport cython
+from cython.parallel import prange
 cdef extern from "stdio.h":
     int snprintf(char *str, size_t size, const char *format, ...) noexcept nogil
 from imagecloud.native.base_logger cimport (  
     log_debug 
 )
-cdef struct SizeDistance:
-    Size size
-    int distance
-
-cdef SizeDistance resize_closest_to_area(Size self, int area, int step_size, ResizeType resize_type) noexcept nogil:
-    cdef Size grow_size = adjust(self, step_size, resize_type)
-    cdef Size shrink_size = adjust(self, -1 * step_size, resize_type)
-    cdef int grow_distance = abs(area - (grow_size.width * grow_size.height))
-    cdef int shrink_distance = abs(area - (shrink_size.width * shrink_size.height))
-
-    cdef SizeDistance result
-    if grow_distance <= shrink_distance:
-        result.size = grow_size
-        result.distance = grow_distance
-    else:
-        result.size = shrink_size
-        result.distance = shrink_distance
-    return result
-
 cdef ResizeType to_resize_type(int t) noexcept nogil:
     if 1 == t:
         return ResizeType.MAINTAIN_ASPECT_RATIO
@@ -89,38 +71,58 @@ cdef Size untranspose(Size self, Transpose transpose) noexcept nogil:
         return create_size(self.height, self.width)
     return self
 
-cdef Size sampled_resize_closest_to_area(Size self, int area, int step_size, ResizeType resize_type) noexcept nogil:
-    cdef int sampling_count = 0
-    cdef Size last_size = self
-    cdef SizeDistance best_size_distance
-    cdef SizeDistance last_size_distance
-    cdef int last_distances_len = 6
-    cdef int last_distances[6]
-    cdef int found_best = 0
-
-    while found_best == 0:
-        sampling_count += 1
-        best_size_distance = resize_closest_to_area(last_size, area, step_size, resize_type)
-        
-        if sampling_count == 1:
-            last_size_distance = best_size_distance
-            last_distances[<int>fmod((sampling_count - 1), last_distances_len)] = last_size_distance.distance
-            continue
-        
-        if last_size_distance.distance < best_size_distance.distance:
-            found_best = 1
-            continue
-        else:
-            found_best = 1
-            for i in range(sampling_count-1, <int>fmax(0, sampling_count - last_distances_len),-1):
-                if last_distances[<int>fmod(i, last_distances_len)] != best_size_distance.distance:
-                    found_best = 0
-                    break
-            if found_best != 1:
-                last_distances[<int>fmod((sampling_count - 1), last_distances_len)] = best_size_distance.distance
-                last_size_distance = best_size_distance
+cdef Size size_at_step_total(Size self, int step_total, ResizeType resize_type) noexcept nogil:
+    # closed form of step_total/step_size repeated adjust() calls; aspect-keeping types scale height from the starting aspect ratio
+    cdef int width = self.width + step_total
+    if ResizeType.NO_RESIZE_TYPE == resize_type:
+        return create_size(width, self.height + step_total)
+    return create_size(width, <int>round(width * (<double>self.height / self.width)))
+
+cdef Size resize_closest_to_area(Size self, int area, int step_size, ResizeType resize_type, int min_length) noexcept nogil:
+    """
+    size on the step_size grid reachable from self (keeping resize_type) whose area is closest to area
+    and whose width and height are at least min_length
+    solved from area and aspect ratio instead of sampling one step at a time
+    """
+    cdef int step = step_size if 0 < step_size else 1
+    cdef double target_step_total
+    cdef int min_steps
+    cdef int steps
+    cdef int candidate_steps
+    cdef Size candidate
+    cdef Size result = self
+    cdef long best_distance = -1
+    cdef long distance
+
+    if self.width <= 0 or self.height <= 0 or area <= 0:
+        return self
+
+    if ResizeType.NO_RESIZE_TYPE == resize_type:
+        # (w + x)(h + x) = area
+        target_step_total = (-(self.width + self.height) + sqrt(
+            (<double>self.width - self.height) * (<double>self.width - self.height) + 4.0 * area
+        )) / 2.0
+    else:
+        # w * (w * h0/w0) = area
+        target_step_total = sqrt(area * (<double>self.width / self.height)) - self.width
 
-    return last_size_distance.size
+    # never step below a min_length width or height (height is rounded from width when keeping the aspect ratio)
+    if ResizeType.NO_RESIZE_TYPE == resize_type:
+        min_steps = <int>ceil((<double>min_length - (self.width if self.width < self.height else self.height)) / step)
+    else:
+        min_steps = <int>ceil((fmax(min_length, ceil((min_length - 0.5) * self.width / self.height)) - self.width) / step)
+    steps = <int>floor(target_step_total / step)
+    if steps < min_steps:
+        steps = min_steps
+    for candidate_steps in range(steps, steps + 2):
+        candidate = size_at_step_total(self, candidate_steps * step, resize_type)
+        if candidate.width < min_length or candidate.height < min_length:
+            continue
+        distance = abs(area - (<long>candidate.width * candidate.height))
+        if best_distance < 0 or distance < best_distance:
+            best_distance = distance
+            result = candidate
+    return result
 
 cdef WeightedSize create_weighted_size(float weight, Size size) noexcept nogil:
     cdef WeightedSize self
@@ -161,7 +163,7 @@ def native_create_weighted_size_array(
     return result
 
 def native_resize_to_proportionally_fit(
-    native_weighted_sizes,
+    WeightedSize[:] native_weighted_sizes,
     native_fit_size,
     resize_type: int,
     step_size: int,
@@ -169,34 +171,32 @@ def native_resize_to_proportionally_fit(
 ): # return native_weighted_sizes
     """
     use weights to determine proportion of fit_size for each image
-    fit each image to their proportion by iteratively changing the size until the closest fit is made
+    fit each image to their proportion by solving for the size (on the step_size grid) closest to that proportion
     return fitted images with their proportions
     """
 
     cdef ResizeType eresize_type = to_resize_type(resize_type)
-    cdef WeightedSize[:] result = native_create_weighted_size_array(native_weighted_sizes.shape[0])
+    cdef int total = native_weighted_sizes.shape[0]
+    cdef WeightedSize[:] result = native_create_weighted_size_array(total)
 
-    cdef float total_weight = 0.0
-    cdef float proportion_weight = 0.0
+    cdef double total_weight = 0.0
     cdef int fit_area = size_area(native_fit_size)
-    cdef int fitted_images = 0
+    cdef int cstep_size = step_size
+    cdef int cmargin = margin
     cdef Size new_size
     cdef int resize_area = 0
-    cdef Size sampled_resize
     cdef int index = 0
-    cdef WeightedSize weighted_size
 
-    for index in range(native_weighted_sizes.shape[0]):
-        weighted_size = native_weighted_sizes[index]
-        total_weight = total_weight + weighted_size.weight
-    
-    for index in range(native_weighted_sizes.shape[0]):
-        weighted_size = native_weighted_sizes[index]
-        proportion_weight = weighted_size.weight / total_weight
-        resize_area = <int>round(proportion_weight * fit_area)
-        new_size = adjust(weighted_size.size, margin, ResizeType.NO_RESIZE_TYPE)
-        sampled_resize = sampled_resize_closest_to_area(new_size, resize_area, step_size, eresize_type)
-        new_size = adjust(sampled_resize, -1 * margin, ResizeType.NO_RESIZE_TYPE)
-        result[index] = create_weighted_size(weighted_size.weight, new_size)
+    with nogil:
+        for index in range(total):
+            total_weight = total_weight + native_weighted_sizes[index].weight
+
+        for index in prange(total):
+            resize_area = <int>round((native_weighted_sizes[index].weight / total_weight) * fit_area)
+            new_size = adjust(native_weighted_sizes[index].size, cmargin, ResizeType.NO_RESIZE_TYPE)
+            # the margin is removed again below, so at least 1 pixel is left after removing it
+            new_size = resize_closest_to_area(new_size, resize_area, cstep_size, eresize_type, 1 + cmargin)
+            new_size = adjust(new_size, -1 * cmargin, ResizeType.NO_RESIZE_TYPE)
+            result[index] = create_weighted_size(native_weighted_sizes[index].weight, new_size)
     
     return result
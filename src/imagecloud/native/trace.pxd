@@ -0,0 +1,16 @@
+# cython: language_level=3
+# cython: boundscheck=False
+# cython: wraparound=False
+
+cdef struct TraceSpan:
+    const char* name
+    long long start_ns
+    long long end_ns
+    int width
+    int height
+    int positions
+
+cdef bint trace_enabled() noexcept nogil
+cdef long long trace_now_ns() noexcept nogil
+cdef void trace_span(const char* name, long long start_ns, long long end_ns, int width, int height, int positions) noexcept nogil
+cdef list drain_spans()
@@ -0,0 +1,83 @@
+# cython: language_level=3
+# cython: boundscheck=False
+# cython: wraparound=False
+# distutils: language = c++
+# distutils: extra_compile_args = -std=c++11
+from libcpp.atomic cimport atomic, memory_order_acquire, memory_order_release
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+
+# native spans are written into a fixed ring buffer without taking the GIL, as native log records are,
+# and are handed to the python tracer when it drains them (between native calls)
+cdef enum:
+    TRACE_RING_CAPACITY = 4096
+
+cdef bint g_trace_enabled = False
+cdef TraceSpan g_ring_spans[TRACE_RING_CAPACITY]
+cdef atomic[int] g_ring_ready[TRACE_RING_CAPACITY]
+# head: next span claimed by a writer, tail: next span read by the (single, GIL holding) reader
+cdef atomic[unsigned long] g_ring_head
+cdef atomic[unsigned long] g_ring_tail
+cdef atomic[unsigned long] g_ring_dropped
+
+cdef bint trace_enabled() noexcept nogil:
+    global g_trace_enabled
+    return g_trace_enabled
+
+cdef long long trace_now_ns() noexcept nogil:
+    # same clock as python time.perf_counter_ns (linux), so native spans line up with python spans
+    cdef timespec now
+    clock_gettime(CLOCK_MONOTONIC, &now)
+    return (<long long>now.tv_sec) * 1000000000 + now.tv_nsec
+
+cdef void trace_span(const char* name, long long start_ns, long long end_ns, int width, int height, int positions) noexcept nogil:
+    global g_ring_head
+    global g_ring_tail
+    global g_ring_dropped
+    cdef unsigned long head = g_ring_head.load(memory_order_acquire)
+    cdef unsigned long slot
+    if not trace_enabled():
+        return
+    while True:
+        if TRACE_RING_CAPACITY <= head - g_ring_tail.load(memory_order_acquire):
+            g_ring_dropped.fetch_add(1)
+            return
+        if g_ring_head.compare_exchange_weak(head, head + 1):
+            break
+    slot = head % TRACE_RING_CAPACITY
+    g_ring_spans[slot].name = name
+    g_ring_spans[slot].start_ns = start_ns
+    g_ring_spans[slot].end_ns = end_ns
+    g_ring_spans[slot].width = width
+    g_ring_spans[slot].height = height
+    g_ring_spans[slot].positions = positions
+    g_ring_ready[slot].store(1, memory_order_release)
+
+cdef list drain_spans():
+    global g_ring_tail
+    cdef unsigned long tail = g_ring_tail.load(memory_order_acquire)
+    cdef unsigned long slot
+    cdef TraceSpan span
+    cdef list result = list()
+    while tail != g_ring_head.load(memory_order_acquire):
+        slot = tail % TRACE_RING_CAPACITY
+        # claimed but still being written, the rest is drained next time
+        if 0 == g_ring_ready[slot].load(memory_order_acquire):
+            break
+        span = g_ring_spans[slot]
+        g_ring_ready[slot].store(0, memory_order_release)
+        tail = tail + 1
+        g_ring_tail.store(tail, memory_order_release)
+        result.append((
+            span.name.decode('utf-8', 'replace'),
+            span.start_ns,
+            span.end_ns,
+            {'width': span.width, 'height': span.height, 'positions': span.positions}
+        ))
+    return result
+
+def native_set_trace(enabled: bool): # return nothing
+    global g_trace_enabled
+    g_trace_enabled = enabled
+
+def native_drain_trace(): # return list of (name, start_ns, end_ns, args) and number of spans dropped since last drain
+    return drain_spans(), g_ring_dropped.exchange(0)
@@ -0,0 +1,80 @@
+import struct
+import zlib
+import numpy as np
+from imagecloud.size import Size
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# png color type of each canvas mode that can be streamed
+PNG_COLOR_TYPES = {
+    'L': 0,
+    'RGB': 2,
+    'RGBA': 6
+}
+PNG_FILTER_SUB = 1
+DEFAULT_COMPRESS_LEVEL = 6
+
+
+class PNGStripWriter:
+    """
+    8-bit png encoder fed horizontal strips of rows, top to bottom.
+    Each strip is filtered and compressed as it is written, so only one strip of the image is held in memory.
+    """
+    def __init__(self, filepath: str, size: Size, mode: str, compress_level: int = DEFAULT_COMPRESS_LEVEL) -> None:
+        if mode not in PNG_COLOR_TYPES:
+            raise ValueError('Cannot stream {0} images to png, mode must be one of [{1}]'.format(mode, ','.join(PNG_COLOR_TYPES.keys())))
+        self._filepath = filepath
+        self._size = size
+        self._mode = mode
+        self._compress_level = compress_level
+        self._rows_written = 0
+        self._file = None
+        self._compressor = None
+
+    @property
+    def filepath(self) -> str:
+        return self._filepath
+
+    def __enter__(self):
+        self._file = open(self._filepath, 'wb')
+        self._compressor = zlib.compressobj(self._compress_level)
+        self._file.write(PNG_SIGNATURE)
+        self._write_chunk(b'IHDR', struct.pack(
+            '>IIBBBBB',
+            self._size.width,
+            self._size.height,
+            8,
+            PNG_COLOR_TYPES[self._mode],
+            0,
+            0,
+            0
+        ))
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        try:
+            if exc_type is None:
+                if self._rows_written != self._size.height:
+                    raise ValueError('Wrote {0} of {1} rows to {2}'.format(self._rows_written, self._size.height, self._filepath))
+                self._write_chunk(b'IDAT', self._compressor.flush())
+                self._write_chunk(b'IEND', b'')
+        finally:
+            self._file.close()
+
+    def write(self, strip: np.ndarray) -> None:
+        rows = strip.reshape(strip.shape[0], -1)
+        bytes_per_pixel = 1 if strip.ndim == 2 else strip.shape[2]
+        # each row is prefixed by its filter type; Sub stores the difference to the pixel on the left (mod 256)
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = PNG_FILTER_SUB
+        filtered[:, 1:bytes_per_pixel + 1] = rows[:, :bytes_per_pixel]
+        np.subtract(rows[:, bytes_per_pixel:], rows[:, :-bytes_per_pixel], out=filtered[:, bytes_per_pixel + 1:], dtype=np.uint8)
+        self._write_chunk(b'IDAT', self._compressor.compress(filtered.tobytes()))
+        self._rows_written += rows.shape[0]
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        if chunk_type == b'IDAT' and 0 == len(data):
+            return
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+from PIL import Image
+from imagecloud.size import Size
+from imagecloud.box import Box
+from imagecloud.image_wrappers import (ImageSource, to_image_bytes)
+
+
+class RenderStep:
+    """
+    what rendering one layout item at one scale takes: its source, orientation, the box its image fills and the size it is resized to
+    (the scaled placement size, which rounding can make differ by a pixel from the size of the scaled box)
+    """
+    def __init__(self, source: ImageSource | Image.Image, orientation: Image.Transpose | None, box: Box, size: Size) -> None:
+        self._source = source
+        self._orientation = orientation
+        self._box = box
+        self._size = size
+
+    @property
+    def source(self) -> ImageSource | Image.Image:
+        return self._source
+
+    @property
+    def orientation(self) -> Image.Transpose | None:
+        return self._orientation
+
+    @property
+    def box(self) -> Box:
+        return self._box
+
+    @property
+    def size(self) -> Size:
+        return self._size
+
+    def to_key(self, mode: str, resample: Image.Resampling) -> tuple[Any, ...]:
+        if isinstance(self._source, ImageSource):
+            source_key = self._source.identity()
+        else:
+            # in-memory images are kept alive by the cache entry, so their id is not reused while cached
+            source_key = id(self._source)
+        return (
+            source_key,
+            self._orientation.name if self._orientation is not None else None,
+            self.size.image_tuple,
+            mode,
+            resample.name
+        )
+
+
+class RenderPlanCache:
+    """
+    byte-bounded LRU of prepared (oriented, resized and mode converted) item images keyed by render step
+    shared by the layouts derived from one another, so re-rendering only prepares the items whose step changed
+    """
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        self._images: OrderedDict[tuple[Any, ...], tuple[ImageSource | Image.Image, Image.Image]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def prepare(
+        self,
+        step: RenderStep,
+        mode: str,
+        resample: Image.Resampling,
+        prepare: Callable[[], Image.Image]
+    ) -> Image.Image:
+        key = step.to_key(mode, resample)
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        image = prepare()
+        image_bytes = to_image_bytes(image)
+        if self._max_bytes < image_bytes:
+            return image
+
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = (step.source, image)
+                self._total_bytes += image_bytes
+            while self._max_bytes < self._total_bytes:
+                _, (_, evicted) = self._images.popitem(last=False)
+                self._total_bytes -= to_image_bytes(evicted)
+        return image
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._total_bytes = 0
@@ -0,0 +1,77 @@
+import io
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+from imagecloud.colors import Color
+import imagecloud.imagecloud_defaults as helper
+
+CHART_MARGIN = 10
+LEGEND_FONT_SIZE = 12
+LEGEND_SPACING = 4
+CHART_BACKGROUND_COLOR = 'white'
+LEGEND_TEXT_COLOR = 'black'
+
+
+@lru_cache(maxsize=1)
+def _legend_font() -> ImageFont.ImageFont | ImageFont.FreeTypeFont:
+    # fonts are only read while drawing, so the one loaded font is shared by all threads
+    return ImageFont.load_default(LEGEND_FONT_SIZE)
+
+def draw_pil_chart(reservation_image: Image.Image, legend: list[tuple[str, Color]]) -> Image.Image:
+    """
+    reservation image with a legend panel (color swatch and label per entry) on its right
+    drawn into a new image with no shared state, so charts can be drawn concurrently
+    """
+    font = _legend_font()
+    ascent, descent = font.getmetrics()
+    row_height = ascent + descent + LEGEND_SPACING
+    label_width = max([int(font.getlength(label)) for label, _ in legend], default=0)
+    legend_left = CHART_MARGIN + reservation_image.width + CHART_MARGIN
+    size = (
+        legend_left + row_height + LEGEND_SPACING + label_width + CHART_MARGIN,
+        2 * CHART_MARGIN + max(reservation_image.height, len(legend) * row_height)
+    )
+    chart = Image.new('RGB', size, CHART_BACKGROUND_COLOR)
+    chart.paste(reservation_image.convert('RGB'), (CHART_MARGIN, CHART_MARGIN))
+    draw = ImageDraw.Draw(chart)
+    upper = CHART_MARGIN
+    for label, color in legend:
+        swatch_size = row_height - LEGEND_SPACING
+        draw.rectangle(
+            (legend_left, upper, legend_left + swatch_size - 1, upper + swatch_size - 1),
+            fill=color.hex_code,
+            outline=LEGEND_TEXT_COLOR
+        )
+        draw.text((legend_left + row_height + LEGEND_SPACING, upper), label, fill=LEGEND_TEXT_COLOR, font=font)
+        upper += row_height
+    return chart
+
+def draw_matplotlib_chart(reservation_image: Image.Image, legend: list[tuple[str, Color]]) -> Image.Image:
+    """
+    reservation image with a matplotlib legend, drawn on its own Figure (not pyplot state) so nothing is left open
+    """
+    # optional backend, imported only when used
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    figure = Figure()
+    axes = figure.subplots()
+    axes.imshow(reservation_image)
+    axes.legend(
+        handles=[Patch(color=color.hex_code, label=label) for label, color in legend],
+        bbox_to_anchor=(1.05, 1),
+        loc=2,
+        borderaxespad=0.
+    )
+    axes.axis('off')
+    figure.tight_layout()
+    with io.BytesIO() as buf:
+        figure.savefig(buf, format='png')
+        buf.seek(0)
+        with Image.open(buf) as image:
+            image.load()
+    return image
+
+def draw_reservation_chart(reservation_image: Image.Image, legend: list[tuple[str, Color]], backend: str = helper.DEFAULT_RESERVATION_CHART_BACKEND) -> Image.Image:
+    if backend == 'MATPLOTLIB':
+        return draw_matplotlib_chart(reservation_image, legend)
+    return draw_pil_chart(reservation_image, legend)
@@ -9,6 +9,9 @@ from imagecloud.native.reservations import (
     native_sample_to_find_unreserved_opening,
     native_maximize_existing_reservation
 )
+from imagecloud.native.base_logger import (
+    native_drain_base_logger
+)
 from imagecloud.base_logger import BaseLogger
 ReservationMapDataType = np.uint32
 ReservationMapType = np.ndarray[ReservationMapDataType, ReservationMapDataType]
@@ -20,6 +23,51 @@ class Reservation:
         self.no = no
         self.box = box
 
+SAMPLING_COUNTERS = [
+    'positions_examined',
+    'cells_read',
+    'candidates_found',
+    'rotations_tried',
+    'shrink_steps',
+    'scan_ns'
+]
+
+class SamplingCounters(object):
+    """
+    work done by the native sampler: positions examined, cells read, (unreserved) candidates found,
+    rotations tried, shrink steps and nanoseconds spent scanning; added up per layout
+    """
+    def __init__(
+        self,
+        positions_examined: int = 0,
+        cells_read: int = 0,
+        candidates_found: int = 0,
+        rotations_tried: int = 0,
+        shrink_steps: int = 0,
+        scan_ns: int = 0
+    ):
+        self.positions_examined = positions_examined
+        self.cells_read = cells_read
+        self.candidates_found = candidates_found
+        self.rotations_tried = rotations_tried
+        self.shrink_steps = shrink_steps
+        self.scan_ns = scan_ns
+
+    def add(self, other: 'SamplingCounters') -> None:
+        for counter in SAMPLING_COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+
+    def to_dict(self) -> dict[str, int]:
+        return {counter: getattr(self, counter) for counter in SAMPLING_COUNTERS}
+
+    def counters_to_string(self) -> str:
+        return ' '.join(['{0}({1})'.format(counter, getattr(self, counter)) for counter in SAMPLING_COUNTERS])
+
+    @staticmethod
+    def from_native(native_samplingcounters):
+        return SamplingCounters(**{counter: native_samplingcounters[counter] for counter in SAMPLING_COUNTERS})
+
+
 class SampledUnreservedOpening(object):
     
     def __init__(
@@ -29,7 +77,8 @@ class SampledUnreservedOpening(object):
         new_size: Size,
         opening_box: Box | None = None,
         actual_box: Box | None = None,
-        orientation: Image.Transpose | None = None
+        orientation: Image.Transpose | None = None,
+        counters: SamplingCounters | None = None
     ):
         self.found = found
         self.sampling_total = sampling_total
@@ -37,6 +86,7 @@ class SampledUnreservedOpening(object):
         self.opening_box = opening_box
         self.actual_box = actual_box
         self.orientation = orientation
+        self.counters = counters if counters is not None else SamplingCounters()
     
     @staticmethod
     def from_native(native_sampledunreservedopening):
@@ -47,13 +97,15 @@ class SampledUnreservedOpening(object):
                 Size.from_native(native_sampledunreservedopening['new_size']),
                 Box.from_native(native_sampledunreservedopening['opening_box']),
                 Box.from_native(native_sampledunreservedopening['actual_box']),
-                Image.Transpose(native_sampledunreservedopening['orientation']) if 0 <= native_sampledunreservedopening['orientation'] else None
+                Image.Transpose(native_sampledunreservedopening['orientation']) if 0 <= native_sampledunreservedopening['orientation'] else None,
+                SamplingCounters.from_native(native_sampledunreservedopening['counters'])
             )
         else:
             return  SampledUnreservedOpening(
                 False,
                 native_sampledunreservedopening['sampling_total'],
                 Size.from_native(native_sampledunreservedopening['new_size']),
+                counters=SamplingCounters.from_native(native_sampledunreservedopening['counters'])
             )
 
 
@@ -89,16 +141,21 @@ class Reservations(object):
     def reservation_map(self) -> ReservationMapType:
         return self._reservation_map
 
+    @property
+    def fill_ratio(self) -> float:
+        """
+        reserved fraction of the reservation map (counted on each call)
+        """
+        return np.count_nonzero(self._reservation_map) / self._reservation_map.size if 0 < self._reservation_map.size else 0.0
+
     def reserve_opening(self, name: str, reservation_no: int, opening: Box) -> None:
         if not(self._map_box.contains(opening)):
             self.logger.error("BAD OPENING: reserve_opening reservation_map{0} cannot contain opening{1}".format(
                 self._map_box.box_to_string(), opening.box_to_string()
             ))
             return
-        self.logger.debug("RESERVED: reserve_opening reservation({0}) opening{1}".format(reservation_no, opening.box_to_string()))
-        for row in range(opening.upper, opening.lower):
-            for col in range(opening.left, opening.right):
-                self._reservation_map[row, col] = reservation_no
+        self.logger.debug("RESERVED: reserve_opening reservation({0}) opening{1}", reservation_no, opening.box_to_string())
+        self._reservation_map[opening.upper:opening.lower, opening.left:opening.right] = reservation_no
         self._reservations.append(Reservation(name, reservation_no, opening))
 
     def sample_to_find_unreserved_opening(
@@ -121,6 +178,10 @@ class Reservations(object):
             step_size,
             self._random
         )
+        # native records (and spans) are buffered while sampling, log them between placements
+        native_drain_base_logger()
+        if self.logger.tracer is not None:
+            self.logger.tracer.drain_native()
         return SampledUnreservedOpening.from_native(native_SampledUnreservedOpening)
     
     def maximize_existing_reservation(self, existing_reservation: Box) -> Box:
@@ -129,6 +190,7 @@ class Reservations(object):
             self._reservation_map,
             existing_reservation.to_native()
         )
+        native_drain_base_logger()
         return Box.from_native(native_box)
     
     @staticmethod
@@ -137,7 +199,8 @@ class Reservations(object):
         result._map_size = Size(reservation_map.shape[1], reservation_map.shape[0])
         result._map_box = Box(0, 0, result._map_size.width, result._map_size.height)
         result._buffer_length = result._map_size.area
-        result._reservation_map = reservation_map
+        # reservations are written into the map; copy read-only (memory-mapped) or non-contiguous maps
+        result._reservation_map = np.require(reservation_map, ReservationMapDataType, ['C_CONTIGUOUS', 'WRITEABLE'])
         result._position_buffer = np.zeros((result._buffer_length), dtype=ReservationMapDataType)
         result._native_reservations = native_create_reservations(
             result.num_threads,
@@ -151,9 +214,22 @@ class Reservations(object):
         
         
     @staticmethod
-    def create_reservation_map(logger: BaseLogger, map_size: Size, reservations: list[Box]) -> ReservationMapType:
-        reserver = Reservations(logger, map_size)
+    def create_reservation_map(
+        logger: BaseLogger | None,
+        map_size: Size,
+        reservations: list[Box],
+        reservation_nos: list[int] | None = None
+    ) -> ReservationMapType:
+        # one slice fill per reservation; reservation_nos default to 1..N in reservation order
+        map_box = Box(0, 0, map_size.width, map_size.height)
+        result: ReservationMapType = np.zeros(map_size.nd_shape, dtype=ReservationMapDataType)
         for i in range(len(reservations)):
-            reserver.reserve_opening('', i+1, reservations[i])
-        return reserver._reservation_map
+            if not(map_box.contains(reservations[i])):
+                if logger is not None:
+                    logger.error("BAD OPENING: create_reservation_map reservation_map{0} cannot contain opening{1}".format(
+                        map_box.box_to_string(), reservations[i].box_to_string()
+                    ))
+                continue
+            result[reservations[i].upper:reservations[i].lower, reservations[i].left:reservations[i].right] = reservation_nos[i] if reservation_nos is not None else i + 1
+        return result
 
@@ -0,0 +1,151 @@
+import os
+import glob
+import hashlib
+import threading
+from PIL import Image
+from imagecloud.size import Size
+from imagecloud.image_wrappers import ImageSource
+
+THUMBNAIL_SUFFIX = 'png'
+# a cached thumbnail up to this many times the requested size is downsampled instead of re-rendering from source
+NEARBY_SCALE_LIMIT = 2.0
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+class ThumbnailCache:
+    """
+    persistent, byte-bounded directory of rendered (oriented and resized) images.
+    Entries are keyed by source identity (mtime+filesize, or content digest), target size, orientation, mode and resample filter.
+    Least recently used entries (by file mtime, refreshed on every hit) are evicted once max_bytes is exceeded.
+    """
+    def __init__(self, directory: str, max_bytes: int, use_content_digest: bool = False) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._use_content_digest = use_content_digest
+        self._lock = threading.Lock()
+        self._source_keys: dict[tuple[str, int, int, str | None], str] = dict()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(
+            os.path.getsize(filepath) for filepath in glob.glob(os.path.join(directory, '*.{0}'.format(THUMBNAIL_SUFFIX)))
+        )
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(
+        self,
+        source: ImageSource,
+        size: Size,
+        orientation: Image.Transpose | None,
+        resample: Image.Resampling = Image.Resampling.BICUBIC
+    ) -> Image.Image | None:
+        prefix = self._to_prefix(source, orientation, resample)
+        filepath = '{0}.{1}x{2}.{3}'.format(prefix, size.width, size.height, THUMBNAIL_SUFFIX)
+        if os.path.exists(filepath):
+            return self._load(filepath)
+
+        nearby_filepath = self._find_nearby(prefix, size)
+        if nearby_filepath is None:
+            return None
+        image = self._load(nearby_filepath)
+        if image is None:
+            return None
+        # not persisted: the nearby entry serves this size again, and keeping both would only fill the cache
+        return image.resize(size.image_tuple, resample)
+
+    def put(
+        self,
+        source: ImageSource,
+        size: Size,
+        orientation: Image.Transpose | None,
+        image: Image.Image,
+        resample: Image.Resampling = Image.Resampling.BICUBIC
+    ) -> None:
+        filepath = '{0}.{1}x{2}.{3}'.format(self._to_prefix(source, orientation, resample), size.width, size.height, THUMBNAIL_SUFFIX)
+        # write then rename, so concurrent readers (threads or batch workers) never see a partial file
+        temporary_filepath = '{0}.{1}.{2}.tmp'.format(filepath, os.getpid(), threading.get_ident())
+        image.save(temporary_filepath, THUMBNAIL_SUFFIX, compress_level=1)
+        try:
+            # an overwritten entry no longer takes up its bytes
+            replaced_bytes = os.path.getsize(filepath)
+        except OSError:
+            replaced_bytes = 0
+        os.replace(temporary_filepath, filepath)
+        with self._lock:
+            self._total_bytes += os.path.getsize(filepath) - replaced_bytes
+            if self._max_bytes < self._total_bytes:
+                self._evict()
+
+    def _load(self, filepath: str) -> Image.Image | None:
+        try:
+            with Image.open(filepath) as image:
+                image.load()
+            os.utime(filepath)
+            return image
+        except (OSError, ValueError):
+            # evicted by another process between lookup and load, or a damaged entry
+            return None
+
+    def _find_nearby(self, prefix: str, size: Size) -> str | None:
+        result: str | None = None
+        result_area = 0
+        for filepath in glob.glob('{0}.*x*.{1}'.format(glob.escape(prefix), THUMBNAIL_SUFFIX)):
+            try:
+                width, height = [int(v) for v in filepath[len(prefix) + 1:-len(THUMBNAIL_SUFFIX) - 1].split('x')]
+            except ValueError:
+                continue
+            if (size.width <= width <= NEARBY_SCALE_LIMIT * size.width and
+                size.height <= height <= NEARBY_SCALE_LIMIT * size.height and
+                (result is None or width * height < result_area)):
+                result = filepath
+                result_area = width * height
+        return result
+
+    def _to_prefix(self, source: ImageSource, orientation: Image.Transpose | None, resample: Image.Resampling) -> str:
+        return os.path.join(self._directory, '{0}.{1}.{2}.{3}'.format(
+            self._to_source_key(source),
+            orientation.name if orientation is not None else 'NONE',
+            source.mode.replace(';', '_'),
+            resample.name
+        ))
+
+    def _to_source_key(self, source: ImageSource) -> str:
+        identity = source.identity()
+        with self._lock:
+            if identity in self._source_keys:
+                return self._source_keys[identity]
+        if self._use_content_digest:
+            digest = hashlib.sha1()
+            with source.open_file() as file:
+                for chunk in iter(lambda: file.read(DIGEST_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            key = digest.hexdigest()
+        else:
+            key = hashlib.sha1('{0}|{1}|{2}|{3}'.format(*identity).encode('utf-8')).hexdigest()
+        with self._lock:
+            self._source_keys[identity] = key
+        return key
+
+    def _evict(self) -> None:
+        entries: list[tuple[float, int, str]] = list()
+        for filepath in glob.glob(os.path.join(self._directory, '*.{0}'.format(THUMBNAIL_SUFFIX))):
+            try:
+                stat = os.stat(filepath)
+                entries.append((stat.st_mtime, stat.st_size, filepath))
+            except OSError:
+                continue
+        self._total_bytes = sum(entry[1] for entry in entries)
+        entries.sort()
+        for _, file_size, filepath in entries:
+            if self._total_bytes <= self._max_bytes:
+                break
+            try:
+                os.remove(filepath)
+                self._total_bytes -= file_size
+            except OSError:
+                continue
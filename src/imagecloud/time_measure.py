@@ -1,21 +1,26 @@
 import datetime
+import time
 
 class TimeMeasure:
     def __init__(self):
         self.start()
 
-    def start(self) -> datetime.datetime:
-        self._start = datetime.datetime.now()
+    def start(self) -> int:
+        # perf_counter_ns: monotonic and cheaper than datetime.now()
+        self._start = time.perf_counter_ns()
         self._stop = None
         return self._start
     
-    def stop(self) -> datetime.datetime:
-        self._stop = datetime.datetime.now()
+    def stop(self) -> int:
+        self._stop = time.perf_counter_ns()
         return self._stop
 
-    def latency(self) -> datetime.timedelta:
-        stop = self._stop if self._stop is not None else datetime.datetime.now()
+    def latency_ns(self) -> int:
+        stop = self._stop if self._stop is not None else time.perf_counter_ns()
         return stop - self._start
+
+    def latency(self) -> datetime.timedelta:
+        return datetime.timedelta(microseconds=self.latency_ns() / 1000)
     
     def latency_str(self) -> str:
         delta = self.latency()
@@ -28,4 +33,3 @@ class TimeMeasure:
             int(seconds),
             int(milliseconds)
         )
-    
\ No newline at end of file
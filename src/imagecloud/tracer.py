@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+from imagecloud.native.trace import (
+    native_set_trace,
+    native_drain_trace
+)
+
+TRACE_CATEGORY = 'imagecloud'
+NATIVE_TRACE_CATEGORY = 'native'
+
+
+class Tracer:
+    """
+    nested spans (perf_counter_ns) per thread, with the native spans drained from reservations, written as chrome trace-event json
+    (load in chrome://tracing or https://ui.perfetto.dev)
+    span names are formatted (as str.format) only when the span ends
+    """
+    def __init__(self, name: str = '') -> None:
+        self._name = name
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._start_ns = time.perf_counter_ns()
+        self._events: list[dict[str, Any]] = list()
+        self._thread_names: dict[int, str] = dict()
+        self._native_dropped = 0
+        native_set_trace(True)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def _stack(self) -> list[tuple[str, tuple[Any, ...], dict[str, Any] | None, int]]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = list()
+            self._local.stack = stack
+        return stack
+
+    def begin(self, name: str, *args: Any, span_args: dict[str, Any] | None = None) -> None:
+        self._stack().append((name, args, span_args, time.perf_counter_ns()))
+
+    def end(self) -> None:
+        stack = self._stack()
+        if 0 < len(stack):
+            name, args, span_args, start_ns = stack.pop()
+            self.add_span(name.format(*args) if args else name, start_ns, time.perf_counter_ns(), span_args)
+
+    def end_all(self) -> None:
+        while 0 < len(self._stack()):
+            self.end()
+
+    @contextmanager
+    def span(self, name: str, *args: Any, span_args: dict[str, Any] | None = None) -> Iterator[None]:
+        self.begin(name, *args, span_args=span_args)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def add_span(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        span_args: dict[str, Any] | None = None,
+        category: str = TRACE_CATEGORY
+    ) -> None:
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start_ns - self._start_ns) / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': self._pid,
+            'tid': thread.native_id
+        }
+        if span_args:
+            event['args'] = span_args
+        with self._lock:
+            self._events.append(event)
+            self._thread_names.setdefault(thread.native_id, thread.name)
+
+    def drain_native(self) -> None:
+        """
+        add the spans native code recorded since the last drain, on the calling thread
+        """
+        spans, dropped = native_drain_trace()
+        for name, start_ns, end_ns, span_args in spans:
+            self.add_span(name, start_ns, end_ns, span_args, NATIVE_TRACE_CATEGORY)
+        self._native_dropped += dropped
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            metadata = [
+                {'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': 0, 'args': {'name': self._name}},
+                *[
+                    {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': thread_name}}
+                    for tid, thread_name in self._thread_names.items()
+                ]
+            ]
+            return {
+                'traceEvents': [*metadata, *sorted(self._events, key=lambda event: event['ts'])],
+                'displayTimeUnit': 'ms',
+                'otherData': {'native_spans_dropped': self._native_dropped}
+            }
+
+    def write(self, filepath: str) -> None:
+        self.end_all()
+        with open(filepath, 'w') as file:
+            json.dump(self.to_dict(), file)
+            file.write('\n')
+
+    def close(self) -> None:
+        # stop native spans recording and drop any not drained; safe to call more than once
+        native_set_trace(False)
+        native_drain_trace()
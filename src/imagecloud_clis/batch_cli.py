@@ -0,0 +1,275 @@
+import argparse
+import csv
+import os
+import shlex
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from imagecloud.base_logger import BaseLogger
+from imagecloud.file_logger import FileLogger
+from imagecloud.time_measure import TimeMeasure
+from imagecloud.parsers import to_unused_filepath
+from imagecloud.image_wrappers import (
+    DecodedImageCache,
+    set_decoded_image_cache
+)
+from imagecloud.imagecloud_defaults import DEFAULT_IMAGE_FORMAT, IMAGE_FORMATS, IMAGE_FORMAT_HELP
+import imagecloud_clis.cli_helpers as cli_helpers
+from imagecloud_clis.generate_cli import GenerateCLIArguments, generate
+
+DEFAULT_MAX_WORKERS = str(os.cpu_count() or 1)
+DEFAULT_DECODED_IMAGE_CACHE_MB = '1024'
+DEFAULT_VERBOSE = False
+
+BATCH_JOB_NAME = 'job_name'
+BATCH_JOB_INPUT = 'input'
+BATCH_JOB_ARGUMENTS = 'arguments'
+BATCH_JOB_HEADERS = [
+    BATCH_JOB_NAME,
+    BATCH_JOB_INPUT,
+    BATCH_JOB_ARGUMENTS
+]
+BATCH_MANIFEST_FILE_HELP = '''csv manifest of generate_imagecloud jobs with following format:
+"{0}","{1}","{2}"
+"<empty>|<job-name-1>","<csv-filepath-of-weighted-images-1>","<empty>|<generate_imagecloud-arguments-1>"
+...
+"<empty>|<job-name-N>","<csv-filepath-of-weighted-images-N>","<empty>|<generate_imagecloud-arguments-N>"
+each job writes to its own <output-directory>/<job-name> directory (job names are made unique by suffixing .1, .2 ...).
+job arguments override the batch -output_directory, -output_image_format and -verbose for that job.
+
+'''.format(*BATCH_JOB_HEADERS)
+
+BATCH_SUMMARY_HEADERS = [
+    BATCH_JOB_NAME,
+    BATCH_JOB_INPUT,
+    'status',
+    'latency',
+    'outputs',
+    'error'
+]
+# separates the filepaths in the summary outputs column
+BATCH_SUMMARY_OUTPUTS_SEPARATOR = ';'
+
+
+class BatchJob:
+    def __init__(self, name: str, input: str, arguments: list[str]) -> None:
+        self.name = name
+        self.input = input
+        self.arguments = arguments
+
+
+class BatchJobResult:
+    def __init__(self, job: BatchJob, succeeded: bool, latency_str: str, error: str = '', output_filepaths: list[str] | None = None) -> None:
+        self.job = job
+        self.succeeded = succeeded
+        self.latency_str = latency_str
+        self.error = error
+        self.output_filepaths = output_filepaths if output_filepaths is not None else list()
+
+    def to_csv_data(self) -> dict[str, str]:
+        return {
+            BATCH_JOB_NAME: self.job.name,
+            BATCH_JOB_INPUT: self.job.input,
+            'status': 'succeeded' if self.succeeded else 'failed',
+            'latency': self.latency_str,
+            'outputs': BATCH_SUMMARY_OUTPUTS_SEPARATOR.join(self.output_filepaths),
+            'error': self.error
+        }
+
+
+class BatchCLIArguments:
+    name = 'batch_imagecloud'
+    def __init__ (
+        self,
+        parsedArgs: argparse.Namespace
+    ) -> None:
+        self.input: str = parsedArgs.input
+        self.output_directory: str | None = parsedArgs.output_directory
+        self.output_image_format: str = parsedArgs.output_image_format
+        self.max_workers: int = parsedArgs.max_workers
+        self.decoded_image_cache_mb: int = parsedArgs.decoded_image_cache_mb
+        self.verbose: bool = parsedArgs.verbose
+        if parsedArgs.log_filepath:
+            self.logger: BaseLogger = FileLogger.create(self.name, parsedArgs.verbose, parsedArgs.log_filepath)
+        else:
+            self.logger: BaseLogger = BaseLogger.create(self.name, parsedArgs.verbose)
+
+    def load_jobs(self) -> list[BatchJob]:
+        result: list[BatchJob] = list()
+        names: set[str] = set()
+        with open(self.input, 'r') as file:
+            csv_reader = csv.DictReader(file, fieldnames=BATCH_JOB_HEADERS)
+            next(csv_reader)
+            for row in csv_reader:
+                input = row[BATCH_JOB_INPUT]
+                name = row[BATCH_JOB_NAME] if row[BATCH_JOB_NAME] else os.path.splitext(os.path.basename(input))[0]
+                # jobs run concurrently, so each gets its own output directory named after its (unique) job name
+                unique_name = name
+                suffix = 0
+                while unique_name in names:
+                    suffix += 1
+                    unique_name = '{0}.{1}'.format(name, suffix)
+                name = unique_name
+                names.add(name)
+                arguments = [
+                    '-i', input,
+                    '-output_image_format', self.output_image_format,
+                    '-no-show_imagecloud',
+                    '-no-show_imagecloud_reservation_chart',
+                    '-verbose' if self.verbose else '-no-verbose'
+                ]
+                if self.output_directory is not None:
+                    job_directory = os.path.join(self.output_directory, name)
+                    os.makedirs(job_directory, exist_ok=True)
+                    arguments.extend(['-output_directory', job_directory])
+                # argparse keeps the last occurrence, so job arguments override batch defaults
+                arguments.extend(shlex.split(row[BATCH_JOB_ARGUMENTS] if row[BATCH_JOB_ARGUMENTS] else ''))
+                result.append(BatchJob(name, input, arguments))
+        return result
+
+    def write_summary(self, results: list[BatchJobResult]) -> str:
+        summary_directory = self.output_directory if self.output_directory is not None else os.path.dirname(self.input)
+        name = '{0}.batch_summary'.format(os.path.splitext(os.path.basename(self.input))[0])
+        filepath = to_unused_filepath(summary_directory, name, 'csv')
+        with open(filepath, 'w') as file:
+            csv_writer = csv.DictWriter(file, fieldnames=BATCH_SUMMARY_HEADERS)
+            csv_writer.writeheader()
+            for result in results:
+                csv_writer.writerow(result.to_csv_data())
+        return filepath
+
+    @staticmethod
+    def parse(arguments: list[str]):
+        parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawTextHelpFormatter,
+            prog=BatchCLIArguments.name,
+            description='''
+            Generate many \'ImageCloud\'s from a manifest of generate_imagecloud jobs using a pool of worker processes.
+            '''
+        )
+        parser.add_argument(
+            '-i',
+            '--input',
+            metavar='<csv_filepath>',
+            type=lambda fp: cli_helpers.existing_filepath(parser, fp),
+            required=True,
+            help='Required, {0}'.format(BATCH_MANIFEST_FILE_HELP)
+        )
+        parser.add_argument(
+            '-output_directory',
+            metavar='<output-directory-path>',
+            type=lambda d: cli_helpers.existing_dirpath(parser, d),
+            help='Optional, output directory for the batch summary and a directory of output per job'
+        )
+        parser.add_argument(
+            '-output_image_format',
+            default=DEFAULT_IMAGE_FORMAT,
+            metavar='{0}'.format('|'.join(IMAGE_FORMATS)),
+            type=lambda v: cli_helpers.is_one_of_array(parser, v, IMAGE_FORMATS),
+            help='Optional,(default %(default)s) {0}'.format(IMAGE_FORMAT_HELP)
+        )
+        parser.add_argument(
+            '-max_workers',
+            default=DEFAULT_MAX_WORKERS,
+            metavar='<int>',
+            type=lambda v: cli_helpers.is_integer(parser, v),
+            help='Optional, (default %(default)s) number of worker processes generating jobs concurrently.'
+        )
+        parser.add_argument(
+            '-decoded_image_cache_mb',
+            default=DEFAULT_DECODED_IMAGE_CACHE_MB,
+            metavar='<int>',
+            type=lambda v: cli_helpers.is_integer(parser, v),
+            help='Optional, (default %(default)s) megabytes of decoded images each worker keeps for reuse by later jobs.'
+        )
+        parser.add_argument(
+            '-verbose',
+            action='store_true',
+            help='Optional, {0}report progress as constructing clouds'.format('(default) ' if DEFAULT_VERBOSE else '')
+        )
+        parser.add_argument(
+            '-no-verbose',
+            action='store_false',
+            dest='verbose',
+            help='Optional, {0}report progress as constructing clouds'.format('' if DEFAULT_VERBOSE else '(default) ')
+        )
+        parser.set_defaults(verbose=DEFAULT_VERBOSE)
+        parser.add_argument(
+            '-log_filepath',
+            metavar='<log-filepath>',
+            type=lambda fp: cli_helpers.existing_dirpath_of_filepath(parser, fp),
+            help='Optional, batch progress logging will also be written to this logfile'
+        )
+
+        args = parser.parse_args(arguments if 0 < len(arguments) else ['-h'])
+        return BatchCLIArguments(args)
+
+
+def _init_worker(decoded_image_cache_mb: int) -> None:
+    # generate imports these at first use, load them once per worker before its first job
+    import imagecloud.imagecloud
+    set_decoded_image_cache(DecodedImageCache(decoded_image_cache_mb * 1024 * 1024))
+
+def _run_job(job: BatchJob) -> BatchJobResult:
+    measure = TimeMeasure()
+    measure.start()
+    args: GenerateCLIArguments | None = None
+    try:
+        args = GenerateCLIArguments.parse(job.arguments)
+        generate(args)
+        measure.stop()
+        return BatchJobResult(job, True, measure.latency_str(), output_filepaths=args.output_filepaths)
+    except SystemExit as e:
+        measure.stop()
+        return BatchJobResult(job, False, measure.latency_str(), 'invalid arguments (exit {0})'.format(e.code))
+    except Exception as e:
+        measure.stop()
+        return BatchJobResult(job, False, measure.latency_str(), '{0}\n{1}'.format(str(e), ''.join(traceback.format_exception(e))))
+    finally:
+        # workers run many jobs, each with its own logger
+        if args is not None:
+            args.close()
+
+
+def batch(args: BatchCLIArguments | None = None) -> None:
+    sys_args = sys.argv[1:]
+    if args == None:
+        args = BatchCLIArguments.parse(sys_args)
+
+    args.logger.info('{0} {1}'.format(BatchCLIArguments.name, ' '.join(sys_args)))
+    args.logger.info('loading {0} ...'.format(args.input))
+    jobs = args.load_jobs()
+    args.logger.info('loaded {0} jobs, running on {1} workers'.format(len(jobs), args.max_workers))
+
+    measure = TimeMeasure()
+    measure.start()
+    results: list[BatchJobResult | None] = [None] * len(jobs)
+    completed = 0
+    with ProcessPoolExecutor(
+        max_workers=args.max_workers,
+        initializer=_init_worker,
+        initargs=(args.decoded_image_cache_mb,)
+    ) as executor:
+        futures = {executor.submit(_run_job, jobs[i]): i for i in range(len(jobs))}
+        for future in as_completed(futures):
+            result = future.result()
+            # keep results in manifest order for the summary
+            results[futures[future]] = result
+            completed += 1
+            if result.succeeded:
+                args.logger.info('[{0}/{1}] {2} succeeded ({3})'.format(completed, len(jobs), result.job.name, result.latency_str))
+            else:
+                args.logger.error('[{0}/{1}] {2} failed ({3}). {4}'.format(completed, len(jobs), result.job.name, result.latency_str, result.error))
+    measure.stop()
+
+    summary_filepath = args.write_summary(results)
+    args.logger.info('completed {0}/{1} jobs ({2}). Summary {3}'.format(
+        len([r for r in results if r.succeeded]),
+        len(jobs),
+        measure.latency_str(),
+        summary_filepath
+    ))
+
+
+if __name__ == '__main__':
+    batch()
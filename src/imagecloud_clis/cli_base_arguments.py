@@ -1,37 +1,128 @@
 import argparse
+from typing import TYPE_CHECKING
 from imagecloud.base_logger import BaseLogger
 from imagecloud.file_logger import FileLogger
+from imagecloud.metrics import Metrics
 import imagecloud_clis.cli_helpers as cli_helpers
 from imagecloud.parsers import to_unused_filepath
-from imagecloud.imagecloud_defaults import DEFAULT_IMAGE_FORMAT, IMAGE_FORMATS, IMAGE_FORMAT_HELP
+from imagecloud.imagecloud_defaults import (
+    DEFAULT_IMAGE_FORMAT,
+    IMAGE_FORMATS,
+    IMAGE_FORMAT_HELP,
+    DEFAULT_IMAGE_THREADS,
+    IMAGE_THREADS_HELP,
+    DEFAULT_THUMBNAIL_CACHE_MB,
+    THUMBNAIL_CACHE_DIRECTORY_HELP,
+    THUMBNAIL_CACHE_MB_HELP,
+    DEFAULT_RESAMPLE,
+    RESAMPLE_TYPES,
+    RESAMPLE_HELP,
+    DEFAULT_COMPOSITOR,
+    COMPOSITOR_TYPES,
+    COMPOSITOR_HELP,
+    DEFAULT_TILE_HEIGHT,
+    TILE_HEIGHT_HELP,
+    DEFAULT_RESERVATION_MAP_FORMAT,
+    RESERVATION_MAP_FORMATS,
+    RESERVATION_MAP_FORMAT_HELP,
+    DEFAULT_LAYOUT_IMAGES,
+    LAYOUT_IMAGES,
+    LAYOUT_IMAGES_HELP,
+    DEFAULT_LAYOUT_FORMAT,
+    LAYOUT_FORMATS,
+    LAYOUT_FORMAT_HELP,
+    DEFAULT_RESERVATION_CHART_BACKEND,
+    RESERVATION_CHART_BACKENDS,
+    RESERVATION_CHART_BACKEND_HELP
+)
+from PIL import Image
+from imagecloud.thumbnail_cache import ThumbnailCache
 from imagecloud.image_wrappers import NamedImage
-from imagecloud.layout import Layout
+# layout (and numpy with it) is imported at first use, so parsing arguments and -h stay fast
+if TYPE_CHECKING:
+    from imagecloud.layout import Layout
+    from imagecloud.tracer import Tracer
+
+DEFAULT_LOG_BACKGROUND_WRITER = False
 
 
 class CLIBaseArguments:
     def __init__ (
         self,
         name: str,
-        parsedArgs: argparse.Namespace
+        parsedArgs: argparse.Namespace,
+        arguments: list[str] | None = None
     ):
+        # the argument list parsed, logged as the invocation (a batch job's own arguments, not the batch command line)
+        self.arguments: list[str] = arguments if arguments is not None else list()
+        # every file written, in order (reported per job by batch)
+        self.output_filepaths: list[str] = list()
         self.input: str = parsedArgs.input
         self.output_directory: str | None = parsedArgs.output_directory
         self.output_image_format: str = parsedArgs.output_image_format
         self.show_imagecloud: bool = parsedArgs.show_imagecloud
         self.show_imagecloud_reservation_chart: bool = parsedArgs.show_imagecloud_reservation_chart
+        self.image_threads: int = parsedArgs.image_threads
+        self.resample: Image.Resampling = Image.Resampling[parsedArgs.resample]
+        self.compositor: str = parsedArgs.compositor
+        self.tile_height: int = parsedArgs.tile_height
+        self.reservation_chart_backend: str = parsedArgs.reservation_chart_backend
+        self.reservation_map_format: str = parsedArgs.reservation_map_format
+        self.layout_images: str = parsedArgs.layout_images
+        self.layout_format: str = parsedArgs.layout_format
+        self.metrics_out: str | None = parsedArgs.metrics_out
+        self.trace_out: str | None = parsedArgs.trace_out
+        self.thumbnail_cache: ThumbnailCache | None = None
+        if parsedArgs.thumbnail_cache_directory:
+            self.thumbnail_cache = ThumbnailCache(
+                parsedArgs.thumbnail_cache_directory,
+                parsedArgs.thumbnail_cache_mb * 1024 * 1024
+            )
         if parsedArgs.log_filepath:
-            self.logger: BaseLogger = FileLogger.create(name, parsedArgs.verbose, parsedArgs.log_filepath)
+            self.logger: BaseLogger = FileLogger.create(name, parsedArgs.verbose, parsedArgs.log_filepath, parsedArgs.log_background_writer)
         else:
             self.logger: BaseLogger = BaseLogger.create(name, parsedArgs.verbose)
+        self.tracer: 'Tracer | None' = None
+        if self.trace_out is not None:
+            from imagecloud.tracer import Tracer
+            self.tracer = Tracer(name)
+            self.logger.tracer = self.tracer
+        self.metrics: Metrics = Metrics(name, self.tracer)
+
+    def _completed(self, filepath: str) -> None:
+        self.output_filepaths.append(filepath)
+        print('completed! {0}'.format(filepath))
 
     def get_output_name(self, existing_name: str | None = None) -> str:
         return cli_helpers.to_name(self.input, self.output_image_format, existing_name, self.output_directory)
 
+    def try_save_tiled_output(self, layout: 'Layout', scale: float = 1.0) -> NamedImage | None:
+        from imagecloud.png_strip_writer import PNG_COLOR_TYPES
+        # composite and encode tile_height rows at a time instead of the whole imagecloud; None when not applicable
+        if (self.output_directory is None or 0 == self.tile_height or
+            self.output_image_format != 'png' or layout.canvas.mode not in PNG_COLOR_TYPES):
+            return None
+
+        filepath = to_unused_filepath(self.output_directory, layout.canvas.name, self.output_image_format)
+        print('saving imagecloud to {0} in {1} row strips'.format(filepath, self.tile_height))
+        layout.write_png_strips(
+            filepath,
+            self.logger,
+            self.tile_height,
+            scale,
+            self.image_threads,
+            self.thumbnail_cache,
+            self.resample,
+            self.metrics
+        )
+        self._completed(filepath)
+        return NamedImage.load(filepath)
+
     def try_save_output(
         self, 
         collage: NamedImage | None = None,
         reservation_chart: NamedImage | None = None,
-        layout: Layout | None = None
+        layout: 'Layout | None' = None
     ) -> bool:
         result: bool = False
         if self.output_directory is None:
@@ -41,25 +132,54 @@ class CLIBaseArguments:
             result = True
             filepath = to_unused_filepath(self.output_directory, collage.name, self.output_image_format)
             print('saving imagecloud to {0}'.format(filepath))
-            collage.image.save(filepath, self.output_image_format)
-            print('completed! {0}'.format(filepath))
+            with self.metrics.phase('encode'):
+                collage.image.save(filepath, self.output_image_format)
+            self._completed(filepath)
 
         if reservation_chart:
             result = True
             filepath = to_unused_filepath(self.output_directory, reservation_chart.name, self.output_image_format)
             print('saving imagecloud reservation chart to {0}'.format(filepath))
-            collage.image.save(filepath, self.output_image_format)
-            print('completed! {0}'.format(filepath))
+            with self.metrics.phase('encode'):
+                reservation_chart.image.save(filepath, self.output_image_format)
+            self._completed(filepath)
         
         if layout:
             result = True
-            filepath = to_unused_filepath(self.output_directory, layout.name, 'csv')
+            from imagecloud.layout_storage import BUNDLE_SUFFIX
+            filepath = to_unused_filepath(self.output_directory, layout.name, BUNDLE_SUFFIX if self.layout_format == 'bundle' else 'csv')
             print('saving imagecloud Layout to {0}'.format(filepath))
-            layout.write(filepath)
-            print('completed! {0}'.format(filepath))
+            with self.metrics.phase('write'):
+                layout.write(filepath, self.reservation_map_format, self.layout_images)
+            self._completed(filepath)
         
         return result
 
+    def try_save_metrics(self) -> bool:
+        if self.metrics_out is None:
+            return False
+        print('saving metrics to {0}'.format(self.metrics_out))
+        self.metrics.write(self.metrics_out)
+        self._completed(self.metrics_out)
+        return True
+
+    def try_save_trace(self) -> bool:
+        if self.tracer is None:
+            return False
+        print('saving trace to {0}'.format(self.trace_out))
+        self.tracer.write(self.trace_out)
+        self.tracer.close()
+        self._completed(self.trace_out)
+        return True
+
+    def close(self) -> None:
+        # write queued log messages and release the logfile, for processes (batch workers) that outlive a run
+        if isinstance(self.logger, FileLogger):
+            self.logger.close()
+        # a run that failed before its trace was saved would leave native spans recording into later runs
+        if self.tracer is not None:
+            self.tracer.close()
+
     @staticmethod
     def add_parser_arguments(
         argParser: argparse.ArgumentParser,
@@ -134,3 +254,96 @@ class CLIBaseArguments:
             help='Optional, all output logging will also be written to this logfile'
             
         )
+        argParser.add_argument(
+            '-log_background_writer',
+            action='store_true',
+            help='Optional, {0}write the logfile on a background thread'.format('(default) ' if DEFAULT_LOG_BACKGROUND_WRITER else '')
+        )
+        argParser.add_argument(
+            '-no-log_background_writer',
+            action='store_false',
+            dest='log_background_writer',
+            help='Optional, {0}write the logfile on a background thread'.format('' if DEFAULT_LOG_BACKGROUND_WRITER else '(default) ')
+        )
+        argParser.set_defaults(log_background_writer=DEFAULT_LOG_BACKGROUND_WRITER)
+        argParser.add_argument(
+            '-metrics_out',
+            metavar='<json-filepath>',
+            type=lambda fp: cli_helpers.existing_dirpath_of_filepath(argParser, fp),
+            help='Optional, write wall and cpu time per phase (load, sizing, scan, reserve, maximize, render, encode, write),\nwith self time leaving out the phases nested in it,\ncounters (scans, samplings, rotations, drops; trial_ counters for the trial placements sizing the images)\nand per image histograms of the run to this json file'
+        )
+        argParser.add_argument(
+            '-trace_out',
+            metavar='<json-filepath>',
+            type=lambda fp: cli_helpers.existing_dirpath_of_filepath(argParser, fp),
+            help='Optional, write nested spans of the run (logging contexts, phases, image preparation and native scans)\nto this chrome trace-event json file (open in chrome://tracing or https://ui.perfetto.dev)'
+        )
+        argParser.add_argument(
+            '-image_threads',
+            default=DEFAULT_IMAGE_THREADS,
+            metavar='<int>',
+            type=lambda v: cli_helpers.is_integer(argParser, v),
+            help='Optional, (default %(default)s) {0}'.format(IMAGE_THREADS_HELP)
+        )
+        argParser.add_argument(
+            '-thumbnail_cache_directory',
+            metavar='<thumbnail-cache-directory-path>',
+            type=lambda d: cli_helpers.existing_dirpath_of_filepath(argParser, d),
+            help='Optional, (default None) {0}'.format(THUMBNAIL_CACHE_DIRECTORY_HELP)
+        )
+        argParser.add_argument(
+            '-thumbnail_cache_mb',
+            default=DEFAULT_THUMBNAIL_CACHE_MB,
+            metavar='<int>',
+            type=lambda v: cli_helpers.is_integer(argParser, v),
+            help='Optional, (default %(default)s) {0}'.format(THUMBNAIL_CACHE_MB_HELP)
+        )
+        argParser.add_argument(
+            '-resample',
+            default=DEFAULT_RESAMPLE,
+            metavar='{0}'.format('|'.join(RESAMPLE_TYPES)),
+            type=lambda v: cli_helpers.is_one_of_array(argParser, v, RESAMPLE_TYPES),
+            help='Optional, (default %(default)s) {0}'.format(RESAMPLE_HELP)
+        )
+        argParser.add_argument(
+            '-compositor',
+            default=DEFAULT_COMPOSITOR,
+            metavar='{0}'.format('|'.join(COMPOSITOR_TYPES)),
+            type=lambda v: cli_helpers.is_one_of_array(argParser, v, COMPOSITOR_TYPES),
+            help='Optional, (default %(default)s) {0}'.format(COMPOSITOR_HELP)
+        )
+        argParser.add_argument(
+            '-reservation_chart_backend',
+            default=DEFAULT_RESERVATION_CHART_BACKEND,
+            metavar='{0}'.format('|'.join(RESERVATION_CHART_BACKENDS)),
+            type=lambda v: cli_helpers.is_one_of_array(argParser, v, RESERVATION_CHART_BACKENDS),
+            help='Optional, (default %(default)s) {0}'.format(RESERVATION_CHART_BACKEND_HELP)
+        )
+        argParser.add_argument(
+            '-tile_height',
+            default=DEFAULT_TILE_HEIGHT,
+            metavar='<int>',
+            type=lambda v: cli_helpers.is_integer(argParser, v),
+            help='Optional, (default %(default)s) {0}'.format(TILE_HEIGHT_HELP)
+        )
+        argParser.add_argument(
+            '-reservation_map_format',
+            default=DEFAULT_RESERVATION_MAP_FORMAT,
+            metavar='{0}'.format('|'.join(RESERVATION_MAP_FORMATS)),
+            type=lambda v: cli_helpers.is_one_of_array(argParser, v, RESERVATION_MAP_FORMATS),
+            help='Optional, (default %(default)s) {0}'.format(RESERVATION_MAP_FORMAT_HELP)
+        )
+        argParser.add_argument(
+            '-layout_images',
+            default=DEFAULT_LAYOUT_IMAGES,
+            metavar='{0}'.format('|'.join(LAYOUT_IMAGES)),
+            type=lambda v: cli_helpers.is_one_of_array(argParser, v, LAYOUT_IMAGES),
+            help='Optional, (default %(default)s) {0}'.format(LAYOUT_IMAGES_HELP)
+        )
+        argParser.add_argument(
+            '-layout_format',
+            default=DEFAULT_LAYOUT_FORMAT,
+            metavar='{0}'.format('|'.join(LAYOUT_FORMATS)),
+            type=lambda v: cli_helpers.is_one_of_array(argParser, v, LAYOUT_FORMATS),
+            help='Optional, (default %(default)s) {0}'.format(LAYOUT_FORMAT_HELP)
+        )
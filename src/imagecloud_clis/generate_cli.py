@@ -1,7 +1,6 @@
 from imagecloud_clis.cli_base_arguments import CLIBaseArguments
 import argparse
 import sys
-import numpy as np
 import imagecloud_clis.cli_helpers as cli_helpers
 from imagecloud.size import ( RESIZE_TYPES, Size)
 from imagecloud.imagecloud_defaults import (
@@ -40,8 +39,8 @@ from imagecloud.image_wrappers import (
     load_weighted_images,
 )
 from imagecloud.imagecloud_defaults import MODE_TYPES
-from imagecloud.imagecloud import ImageCloud
 DEFAULT_MAXIMIZE_EMPTY_SPACE = False
+DEFAULT_VERIFY_RESERVATION_MAP = True
 DEFAULT_SHOW = True
 DEFAULT_VERBOSE = False
 DEFAULT_CLOUD_EXPAND_STEP_SIZE = '0'
@@ -55,9 +54,10 @@ class GenerateCLIArguments(CLIBaseArguments):
     name = 'generate_imagecloud'
     def __init__ (
         self, 
-        parsedArgs
+        parsedArgs,
+        arguments: list[str] | None = None
     ) -> None:
-        super().__init__(self.name, parsedArgs)
+        super().__init__(self.name, parsedArgs, arguments)
         self.max_image_size: Size | None = parsedArgs.max_image_size
         self.min_image_size: Size = parsedArgs.min_image_size
         self.cloud_size: Size = parsedArgs.cloud_size
@@ -72,6 +72,7 @@ class GenerateCLIArguments(CLIBaseArguments):
         self.cloud_expansion_step_size: int = parsedArgs.cloud_expansion_step_size
         self.maximize_empty_space: bool = parsedArgs.maximize_empty_space
         self.total_threads: int = parsedArgs.total_threads
+        self.verify_reservation_map: bool = parsedArgs.verify_reservation_map
     
     @staticmethod
     def parse(arguments: list[str]):
@@ -117,6 +118,18 @@ class GenerateCLIArguments(CLIBaseArguments):
             help='Optional {0}maximize images, after generation, to fill surrounding empty space.'.format('' if DEFAULT_MAXIMIZE_EMPTY_SPACE else '(default) ')
         )
         parser.set_defaults(maximize_empty_space=DEFAULT_MAXIMIZE_EMPTY_SPACE)
+        parser.add_argument(
+            '-verify_reservation_map',
+            action='store_true',
+            help='Optional {0}check the generated reservation map against one rebuilt from the placed image reservations.'.format('(default) ' if DEFAULT_VERIFY_RESERVATION_MAP else '')
+        )
+        parser.add_argument(
+            '-no-verify_reservation_map',
+            action='store_false',
+            dest='verify_reservation_map',
+            help='Optional {0}check the generated reservation map against one rebuilt from the placed image reservations.'.format('' if DEFAULT_VERIFY_RESERVATION_MAP else '(default) ')
+        )
+        parser.set_defaults(verify_reservation_map=DEFAULT_VERIFY_RESERVATION_MAP)
 
         parser.add_argument(
             '-margin',
@@ -201,18 +214,22 @@ class GenerateCLIArguments(CLIBaseArguments):
         )
 
         args = parser.parse_args(arguments if 0 < len(arguments) else ['-h'])
-        return GenerateCLIArguments(args)
+        return GenerateCLIArguments(args, arguments)
 
 
 def generate(args: GenerateCLIArguments | None = None) -> None:
-    sys_args = sys.argv[1:]
     if args == None:
-        args = GenerateCLIArguments.parse(sys_args)
+        args = GenerateCLIArguments.parse(sys.argv[1:])
+    sys_args = args.arguments
+    # imported once arguments are parsed (not for -h): these pull in numpy and the native reservations
+    import numpy as np
+    from imagecloud.imagecloud import ImageCloud
 
     print('{0} {1}'.format(GenerateCLIArguments.name, ' '.join(sys_args)))
     args.logger.info('{0} {1}'.format(GenerateCLIArguments.name, ' '.join(sys_args)))
     args.logger.info('loading {0} ...'.format(args.input))
-    weighted_images: list[WeightedImage] = load_weighted_images(args.input)
+    with args.metrics.phase('load'):
+        weighted_images: list[WeightedImage] = load_weighted_images(args.input, args.image_threads)
     total_images = len(weighted_images)
     args.logger.info('loaded {0} weights and images'.format(total_images))
 
@@ -230,7 +247,8 @@ def generate(args: GenerateCLIArguments | None = None) -> None:
         margin=args.margin,
         mode=args.mode,
         name=args.get_output_name(),
-        total_threads=args.total_threads
+        total_threads=args.total_threads,
+        metrics=args.metrics
     )
     args.logger.info('generating imagecloud from {0} weighted and normalized images.{1}'.format(
         total_images,
@@ -242,16 +260,22 @@ def generate(args: GenerateCLIArguments | None = None) -> None:
         args.logger.info('Maximizing {0} images: expanding them to fit their surrounding empty space.'.format(len(layout.items)))
         layout = image_cloud.maximize_empty_space(layout)
 
-    reconstructed_reservation_map = layout.reconstruct_reservation_map(args.logger)
-    if not(np.array_equal(layout.canvas.reservation_map, reconstructed_reservation_map)):
-        args.logger.info('Warning reservations map from generation not same as reconstructed from images.')
+    if args.verify_reservation_map:
+        reconstructed_reservation_map = layout.reconstruct_reservation_map(args.logger)
+        if not(np.array_equal(layout.canvas.reservation_map, reconstructed_reservation_map)):
+            args.logger.info('Warning reservations map from generation not same as reconstructed from images.')
     
-    collage = layout.to_image(args.logger)
-
-    args.try_save_output(collage, None, layout)
+    collage = args.try_save_tiled_output(layout)
+    if collage is None:
+        collage = layout.to_image(args.logger, image_threads=args.image_threads, thumbnail_cache=args.thumbnail_cache, resample=args.resample, compositor=args.compositor, metrics=args.metrics)
+        args.try_save_output(collage, None, layout)
+    else:
+        args.try_save_output(None, None, layout)
+    args.try_save_metrics()
+    args.try_save_trace()
 
     if args.show_imagecloud_reservation_chart:
-        reservation_chart = layout.to_reservation_chart_image()
+        reservation_chart = layout.to_reservation_chart_image(args.reservation_chart_backend)
         args.try_save_output(None, reservation_chart, None)
         reservation_chart.show()
 
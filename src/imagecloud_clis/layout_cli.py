@@ -14,9 +14,10 @@ class LayoutCLIrguments(CLIBaseArguments):
     name = 'layout_imagecloud'
     def __init__ (
         self, 
-        parsedArgs
+        parsedArgs,
+        arguments: list[str] | None = None
     ) -> None:
-        super().__init__(self.name, parsedArgs)
+        super().__init__(self.name, parsedArgs, arguments)
         self.scale: float = parsedArgs.scale
         self.maximize_empty_space: bool = parsedArgs.maximize_empty_space
     
@@ -57,20 +58,21 @@ class LayoutCLIrguments(CLIBaseArguments):
 
 
         args = parser.parse_args(arguments if 0 < len(arguments) else ['-h'])
-        return LayoutCLIrguments(args)
+        return LayoutCLIrguments(args, arguments)
 
 
 
 
 def layout(args: LayoutCLIrguments | None = None) -> None:
-    sys_args = sys.argv[1:]    
     if args == None:
-        args = LayoutCLIrguments.parse(sys_args)
+        args = LayoutCLIrguments.parse(sys.argv[1:])
+    sys_args = args.arguments
 
     
     args.logger.info('{0} {1}'.format(LayoutCLIrguments.name, ' '.join(sys_args)))
     args.logger.info('loading {0} ...'.format(args.input))
-    layout = Layout.load(args.input)
+    with args.metrics.phase('load'):
+        layout = Layout.load(args.input, args.image_threads)
     args.logger.info('loaded layout with {0} images'.format(len(layout.items)))
     args.logger.info('laying-out and showing imagecloud layout with {0} scaling.'.format(args.scale))
     
@@ -81,13 +83,26 @@ def layout(args: LayoutCLIrguments | None = None) -> None:
 
     if args.maximize_empty_space:
         args.logger.info('Maximizing {0} images: expanding them to fit their surrounding empty space.'.format(len(layout.items)))
-        cloud = ImageCloud.create(layout, args.logger)
+        with args.metrics.phase('load'):
+            layout.materialize(args.image_threads)
+        cloud = ImageCloud.create(layout, args.logger, args.metrics)
         layout = cloud.maximize_empty_space(layout)
         
-    collage = layout.to_image(args.logger, args.scale)
-    reservation_chart = layout.to_reservation_chart_image()
-    args.try_save_output(collage, reservation_chart, layout)
-        
+    # render and chart only what is saved or shown; otherwise the layout stays lazily loaded
+    reservation_chart = None
+    if args.output_directory is not None or args.show_imagecloud_reservation_chart:
+        reservation_chart = layout.to_reservation_chart_image(args.reservation_chart_backend)
+
+    collage = None
+    if args.output_directory is not None or args.show_imagecloud:
+        collage = args.try_save_tiled_output(layout, args.scale)
+        if collage is None:
+            collage = layout.to_image(args.logger, args.scale, args.image_threads, args.thumbnail_cache, args.resample, args.compositor, args.metrics)
+            args.try_save_output(collage)
+    args.try_save_output(None, reservation_chart, layout)
+    args.try_save_metrics()
+    args.try_save_trace()
+
     if args.show_imagecloud:
         collage.show()
 
@@ -0,0 +1,21 @@
+from PIL import Image
+from imagecloud.image_wrappers import (WeightedImage, resize_images_to_proportionally_fit)
+from imagecloud.size import (Size, ResizeType)
+
+
+def test_fitted_size_matches_width_and_height() -> None:
+    weighted_images = [
+        WeightedImage(weight, Image.new('RGB', (475, 1365)), 'image-{0}'.format(weight))
+        for weight in [1, 2, 4]
+    ]
+    fitted = resize_images_to_proportionally_fit(
+        weighted_images,
+        Size(300, 300),
+        ResizeType.MAINTAIN_ASPECT_RATIO,
+        10,
+        2
+    )
+
+    for weighted_image in fitted:
+        assert weighted_image.size.image_tuple == (weighted_image.width, weighted_image.height)
+        assert weighted_image.size.image_tuple != (475, 1365)
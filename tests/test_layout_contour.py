@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from PIL import Image
+from imagecloud.layout import LayoutContour
+from imagecloud.size import Size
+
+MASK_SIZE = Size(400, 200)
+
+
+def to_mask() -> np.ndarray:
+    rows, columns = np.mgrid[0:MASK_SIZE.height, 0:MASK_SIZE.width]
+    mask = np.where(((columns - 200) / 170) ** 2 + ((rows - 100) / 80) ** 2 < 1, 255, 0).astype(np.uint8)
+    mask[20:60, 30:90] = 255
+    return mask
+
+
+@pytest.mark.parametrize('scale', [2, 3, 6])
+@pytest.mark.parametrize('width', [5, 30, 60])
+def test_upscaled_contour_matches_full_resolution(scale: int, width: int) -> None:
+    size = MASK_SIZE.scale(scale)
+    mask = to_mask()
+    # a mask already at output size takes the full resolution path
+    full_resolution = LayoutContour(np.array(Image.fromarray(mask).resize(size.image_tuple)), width, 'red').to_alpha(size)
+    upscaled = LayoutContour(mask, width, 'red').to_alpha(size)
+
+    assert np.count_nonzero(upscaled) == pytest.approx(np.count_nonzero(full_resolution), rel=0.08)
+
+
+def test_strips_match_whole_contour() -> None:
+    size = MASK_SIZE.scale(3)
+    contour = LayoutContour(to_mask(), 30, 'red')
+    whole = contour.to_alpha(size)
+    strips = np.concatenate([
+        contour.to_alpha(size, upper, min(upper + 64, size.height))
+        for upper in range(0, size.height, 64)
+    ])
+
+    assert np.array_equal(whole, strips)
+    # kept at mask resolution, not output resolution
+    assert contour._to_contour(size)[0].shape == MASK_SIZE.nd_shape